@@ -5,12 +5,14 @@ This module provides a wrapper around the BAML-generated client
 for fraud detection analysis.
 """
 import logging
+from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True, frozen=True)
 class LoginEvent:
     """
     Input data structure for BAML fraud detection agent.
@@ -18,50 +20,29 @@ class LoginEvent:
     Represents an authentication event with contextual information
     about recent user activity.
     """
-
-    def __init__(
-        self,
-        user_id: int,
-        username: str,
-        ip_address: Optional[str],
-        user_agent: Optional[str],
-        timestamp: str,
-        event_type: str,
-        failed_attempts_5min: int,
-        failed_2fa_attempts_5min: int,
-        ip_changed: bool,
-        user_agent_changed: bool
-    ):
-        self.user_id = user_id
-        self.username = username
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-        self.timestamp = timestamp
-        self.event_type = event_type
-        self.failed_attempts_5min = failed_attempts_5min
-        self.failed_2fa_attempts_5min = failed_2fa_attempts_5min
-        self.ip_changed = ip_changed
-        self.user_agent_changed = user_agent_changed
-
-
+    user_id: int
+    username: str
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    timestamp: str
+    event_type: str
+    failed_attempts_5min: int
+    failed_2fa_attempts_5min: int
+    ip_changed: bool
+    user_agent_changed: bool
+
+
+@dataclass(slots=True, frozen=True)
 class BAMLFraudAssessment:
     """
     Output data structure from BAML fraud detection agent.
 
     Contains the risk assessment results from the AI agent.
     """
-
-    def __init__(
-        self,
-        risk_score: float,
-        alert: bool,
-        reason: str,
-        confidence: float
-    ):
-        self.risk_score = risk_score
-        self.alert = alert
-        self.reason = reason
-        self.confidence = confidence
+    risk_score: float
+    alert: bool
+    reason: str
+    confidence: float
 
 
 class BAMLClient:
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     # Server Configuration
     MCP_PORT: int = 8001
     LOG_LEVEL: str = "DEBUG"
+    TESTING_MODE: bool = False
 
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./mcp.db"
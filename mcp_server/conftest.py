@@ -0,0 +1,49 @@
+"""
+Pytest configuration for MCP Server test scripts.
+
+Repoints the application at a single in-memory SQLite database before any
+test module imports the app, so tests share one schema, never touch the
+on-disk development DB, and pay no per-commit fsync.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add this directory to the Python path so the flat module imports work
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import db
+
+# Single in-memory database shared by every connection via StaticPool
+db.engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+db.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db.engine)
+
+# Import models so they are registered with Base before creating tables
+import models  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    """Create the schema once per test session instead of once per module"""
+    db.Base.metadata.create_all(bind=db.engine)
+    yield
+    db.Base.metadata.drop_all(bind=db.engine)
+
+
+def pytest_configure(config):
+    # Registered here so the mark is warning-free even without pytest-xdist;
+    # under "pytest -n auto --dist=loadgroup" tests sharing a seeded user
+    # stay on one worker while groups run in parallel
+    config.addinivalue_line(
+        "markers",
+        "xdist_group(name): schedule tests in the named group on the same xdist worker",
+    )
@@ -9,10 +9,11 @@ Implements rule-based fraud detection with scoring rules for:
 
 Also supports AI-powered fraud detection via BAML agent integration.
 """
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Optional
+from sqlalchemy import exists, func, select
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
 import logging
 
 from models import MCPAuthEvent
@@ -21,30 +22,78 @@ from baml_client import get_baml_client, LoginEvent as BAMLLoginEvent
 
 logger = logging.getLogger(__name__)
 
-
-class FraudAssessment(BaseModel):
+# Event types that change the aggregates the scoring rules read; cached
+# assessments must never be served for (or survive) these events
+_FAILURE_EVENT_TYPES = {"login_failure", "2fa_failure"}
+
+# Sliding window the failed-attempt rules count over; built once instead
+# of per analysis call
+_FIVE_MIN = timedelta(minutes=5)
+
+# Tiered failed-attempt rules, evaluated highest threshold first: each
+# entry is (FraudSignals attribute, ((min count, weight, reason format),
+# ...)). Adding a rule or tier extends the table instead of growing the
+# branch ladder in _rule_based_analysis.
+_COUNT_RULES = (
+    (
+        "failed_logins",
+        (
+            (11, 0.7, "Severe brute force attack detected ({n} failed logins in 5 minutes)"),
+            (6, 0.5, "High number of failed login attempts ({n} in 5 minutes)"),
+            (3, 0.3, "Multiple failed login attempts ({n} in 5 minutes)"),
+        ),
+    ),
+    (
+        "failed_2fa",
+        (
+            (11, 0.8, "Severe 2FA brute force attack ({n} failed attempts in 5 minutes)"),
+            (6, 0.6, "High number of failed 2FA attempts ({n} in 5 minutes)"),
+            (3, 0.4, "Multiple failed 2FA attempts ({n} in 5 minutes)"),
+        ),
+    ),
+)
+
+# Change-detection rules: (event attribute, FraudSignals attribute,
+# weight, reason). Fires only when both sides are present and differ.
+_CHANGE_RULES = (
+    ("ip_address", "prev_ip", 0.2, "IP address changed from previous login"),
+    ("user_agent", "prev_ua", 0.1, "User agent changed from previous login"),
+)
+
+
+@dataclass(slots=True, frozen=True)
+class FraudAssessment:
     """
     Result of fraud detection analysis for an authentication event.
 
-    Contains risk score, email notification flag, and explanation of the assessment.
+    Contains the risk score (0 = no risk, 1 = high risk), whether the
+    event should trigger an email notification to the user, an
+    explanation of the assessment, and the detector's confidence in it.
+
+    A slotted frozen dataclass rather than a pydantic model: one is
+    allocated per analyzed event and it never crosses an API boundary
+    (responses use FraudAssessmentOut), so it needs neither validation
+    nor a schema, just cheap construction and attribute access.
+    """
+    risk_score: float
+    email_notification: bool
+    reason: str
+    confidence: float = 1.0
+
+
+@dataclass(slots=True, frozen=True)
+class FraudSignals:
     """
-    risk_score: float = Field(..., ge=0.0, le=1.0, description="Risk score from 0 (no risk) to 1 (high risk)")
-    email_notification: bool = Field(..., description="Whether this event should trigger an email notification to the user")
-    reason: str = Field(..., description="Explanation of the fraud assessment")
-    confidence: float = Field(default=1.0, ge=0.0, le=1.0, description="Confidence in the assessment")
-
-    model_config = {
-        "json_schema_extra": {
-            "examples": [
-                {
-                    "risk_score": 0.8,
-                    "email_notification": True,
-                    "reason": "Multiple failed login attempts (5 in 5 minutes), IP address changed from previous login",
-                    "confidence": 1.0
-                }
-            ]
-        }
-    }
+    Aggregated per-user history feeding the scoring rules.
+
+    Collected by a single SQL round-trip in _collect_signals; prev_ip and
+    prev_ua are None when the user has no prior successful login with the
+    respective field set.
+    """
+    failed_logins: int
+    failed_2fa: int
+    prev_ip: Optional[str]
+    prev_ua: Optional[str]
 
 
 class FraudDetector:
@@ -53,8 +102,23 @@ class FraudDetector:
 
     Implements both rule-based and AI-powered (BAML) detection with
     configurable thresholds and fallback mechanisms.
+
+    Assessments for non-failure events are cached briefly per
+    (user_id, ip_address, user_agent, event_type) signature so repeated
+    identical events during a burst reuse the prior result instead of
+    re-running the historical-event queries.
     """
 
+    # Short TTL bounds staleness; failure events invalidate the user's
+    # entries outright, so only benign repeats are ever served from cache
+    CACHE_TTL_SECONDS = 60
+    CACHE_MAX_ENTRIES = 10_000
+
+    # Per-user (ip, user_agent, timestamp) of the last successful login
+    # the detector has processed; lets _collect_signals skip the two
+    # previous-login subqueries for users seen recently
+    LAST_LOGIN_CACHE_MAX_ENTRIES = 100_000
+
     def __init__(
         self,
         fraud_threshold: float = 0.7,
@@ -73,6 +137,14 @@ class FraudDetector:
         self.baml_enabled = baml_enabled
         self.baml_timeout_ms = baml_timeout_ms
 
+        # Cache of recent assessments keyed by event signature
+        self._assessment_cache = {}
+
+        # Write-through cache of each user's last successful login; the
+        # value only changes when a login_success is processed, so serving
+        # it from memory is safe for every later event
+        self._last_login_cache = {}
+
         # Initialize BAML client if enabled
         self.baml_client = None
         if self.baml_enabled:
@@ -107,31 +179,84 @@ class FraudDetector:
         Returns:
             FraudAssessment with risk score, email_notification flag, and reason
         """
+        if db is None:
+            # Cheap pre-check instead of letting every helper raise and
+            # swallow an AttributeError; callers without a session get
+            # the same safe default minus the exception machinery
+            logger.error("analyze_event called without a database session")
+            return FraudAssessment(
+                risk_score=0.0,
+                email_notification=False,
+                reason="Normal authentication pattern detected",
+                confidence=1.0
+            )
+
         try:
-            # Try BAML analysis if enabled
-            if self.baml_enabled and self.baml_client and self.baml_client.is_available():
+            cache_key = (event.user_id, event.ip_address, event.user_agent, event.event_type)
+
+            if event.event_type in _FAILURE_EVENT_TYPES:
+                # Failures change the counts every rule reads; drop any
+                # cached assessments for this user rather than serving
+                # stale scores during an attack
+                self._invalidate_cached_assessments(event.user_id)
+            else:
+                cached = self._get_cached_assessment(cache_key)
+                if cached is not None:
+                    logger.debug(
+                        f"Returning cached fraud assessment for user {event.user_id} "
+                        f"(event_type: {event.event_type})"
+                    )
+                    return cached
+
+            # One signal-collection pass feeds both analysis paths. A user
+            # with no prior events cannot trigger any rule, so an EXISTS
+            # probe replaces the aggregate query for the common benign case.
+            event_time = event.timestamp
+            signals = None
+            if self._has_prior_events(db, user_id=event.user_id, before=event_time):
+                signals = self._collect_signals(
+                    db,
+                    user_id=event.user_id,
+                    before=event_time,
+                    need_prev_login=bool(event.ip_address or event.user_agent)
+                )
+
+            self._remember_login(event, event_time)
+
+            # Rules are cheap and decisive for most events; run them first
+            # and reserve the BAML round-trip for scores in the uncertain
+            # band below the threshold
+            assessment = self._rule_based_analysis(event, signals)
+
+            if (
+                self.baml_enabled
+                and self.baml_client
+                and self.baml_client.is_available()
+                and self._needs_baml(assessment.risk_score)
+            ):
                 logger.debug(f"Attempting BAML analysis for user {event.user_id}")
-                assessment = self._baml_analysis(event, db)
+                baml_assessment = self._baml_analysis(event, signals)
 
-                if assessment is not None:
+                if baml_assessment is not None:
                     logger.info(
                         f"BAML fraud analysis complete for user {event.user_id}: "
-                        f"risk_score={assessment.risk_score:.2f}, email_notification={assessment.email_notification}, "
-                        f"confidence={assessment.confidence:.2f}"
+                        f"risk_score={baml_assessment.risk_score:.2f}, "
+                        f"email_notification={baml_assessment.email_notification}, "
+                        f"confidence={baml_assessment.confidence:.2f}"
                     )
-                    return assessment
+                    self._cache_assessment(cache_key, event.event_type, baml_assessment)
+                    return baml_assessment
 
                 logger.warning(
                     f"BAML analysis failed for user {event.user_id}, "
                     "falling back to rule-based detection"
                 )
 
-            # Fall back to rule-based analysis
-            assessment = self._rule_based_analysis(event, db)
             logger.info(
                 f"Rule-based fraud analysis complete for user {event.user_id}: "
                 f"risk_score={assessment.risk_score:.2f}, email_notification={assessment.email_notification}"
             )
+            self._cache_assessment(cache_key, event.event_type, assessment)
             return assessment
 
         except Exception as e:
@@ -144,16 +269,174 @@ class FraudDetector:
                 confidence=0.0
             )
 
-    def _baml_analysis(self, event: AuthEventIn, db: Session) -> Optional[FraudAssessment]:
+    def analyze_event_batch(self, events: List[AuthEventIn], db: Session) -> List[FraudAssessment]:
+        """
+        Analyze a batch of authentication events.
+
+        Signals are collected once per distinct user, sampled at that
+        user's latest event in the batch, so a burst of N events costs
+        one signal round-trip per user instead of one per event. Within
+        a batch, earlier events of the same user are therefore scored
+        against the same (most complete) snapshot as the last one.
+
+        Args:
+            events: Authentication events to analyze, in ingestion order
+            db: Database session for querying historical events
+
+        Returns:
+            FraudAssessments in the same order as the input events
+        """
+        if not events:
+            return []
+
+        # Latest event per user defines that user's signal snapshot;
+        # also track whether any of the user's events can fire the
+        # IP/user-agent change rules
+        ref_times = {}
+        need_prev_login = {}
+        for event in events:
+            current = ref_times.get(event.user_id)
+            if current is None or event.timestamp > current:
+                ref_times[event.user_id] = event.timestamp
+            if event.ip_address or event.user_agent:
+                need_prev_login[event.user_id] = True
+            if event.event_type in _FAILURE_EVENT_TYPES:
+                self._invalidate_cached_assessments(event.user_id)
+
+        signals_by_user = {}
+        for user_id, before in ref_times.items():
+            signals = None
+            if self._has_prior_events(db, user_id=user_id, before=before):
+                signals = self._collect_signals(
+                    db,
+                    user_id=user_id,
+                    before=before,
+                    need_prev_login=need_prev_login.get(user_id, False)
+                )
+            signals_by_user[user_id] = signals
+
+        assessments = []
+        try:
+            for event in events:
+                signals = signals_by_user[event.user_id]
+                self._remember_login(event, event.timestamp)
+
+                assessment = self._rule_based_analysis(event, signals)
+
+                if (
+                    self.baml_enabled
+                    and self.baml_client
+                    and self.baml_client.is_available()
+                    and self._needs_baml(assessment.risk_score)
+                ):
+                    baml_assessment = self._baml_analysis(event, signals)
+                    if baml_assessment is not None:
+                        assessment = baml_assessment
+
+                assessments.append(assessment)
+
+            logger.info(
+                f"Batch fraud analysis complete: {len(events)} events, "
+                f"{len(ref_times)} users"
+            )
+            return assessments
+
+        except Exception as e:
+            logger.error(f"Error during batch fraud analysis: {e}", exc_info=True)
+            # Pad with safe defaults so callers still get one assessment
+            # per event, mirroring analyze_event's error behavior
+            default = FraudAssessment(
+                risk_score=0.0,
+                email_notification=False,
+                reason="Analysis failed - defaulting to no risk",
+                confidence=0.0
+            )
+            return assessments + [default] * (len(events) - len(assessments))
+
+    def _needs_baml(self, rule_score: float) -> bool:
+        """
+        Decide whether a BAML round-trip could change the outcome.
+
+        A score of zero (no signals at all) and a score already at or
+        above the fraud threshold are clear-cut, so the expensive LLM
+        call is reserved for the uncertain band in between.
+
+        Args:
+            rule_score: Risk score from rule-based analysis
+
+        Returns:
+            True if BAML analysis should run
+        """
+        return 0.0 < rule_score < self.fraud_threshold
+
+    def _get_cached_assessment(self, cache_key: tuple) -> Optional[FraudAssessment]:
+        """
+        Return a cached assessment for the event signature if still fresh.
+
+        Args:
+            cache_key: (user_id, ip_address, user_agent, event_type) signature
+
+        Returns:
+            Cached FraudAssessment, or None on miss or expiry
+        """
+        cached = self._assessment_cache.get(cache_key)
+        if cached is None:
+            return None
+
+        assessment, cached_at = cached
+        if (datetime.utcnow() - cached_at).total_seconds() >= self.CACHE_TTL_SECONDS:
+            del self._assessment_cache[cache_key]
+            return None
+
+        return assessment
+
+    def _cache_assessment(self, cache_key: tuple, event_type: str, assessment: FraudAssessment) -> None:
+        """
+        Store an assessment for reuse by identical events within the TTL.
+
+        Failure events are never cached since each one shifts the
+        aggregates the next analysis must see.
+
+        Args:
+            cache_key: (user_id, ip_address, user_agent, event_type) signature
+            event_type: Type of the analyzed event
+            assessment: Assessment to cache
+        """
+        if event_type in _FAILURE_EVENT_TYPES:
+            return
+
+        if len(self._assessment_cache) >= self.CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (insertion-ordered dict)
+            self._assessment_cache.pop(next(iter(self._assessment_cache)))
+
+        self._assessment_cache[cache_key] = (assessment, datetime.utcnow())
+
+    def _invalidate_cached_assessments(self, user_id: int) -> None:
+        """
+        Drop all cached assessments for a user.
+
+        Args:
+            user_id: User whose cached assessments are now stale
+        """
+        stale_keys = [key for key in self._assessment_cache if key[0] == user_id]
+        for key in stale_keys:
+            del self._assessment_cache[key]
+
+    def _baml_analysis(
+        self,
+        event: AuthEventIn,
+        signals: Optional[FraudSignals]
+    ) -> Optional[FraudAssessment]:
         """
         Perform AI-powered fraud detection using BAML agent.
 
-        Gathers contextual information about recent user activity and
-        sends it to the BAML agent for analysis.
+        Sends the event plus the already-collected activity signals to
+        the BAML agent; no additional database work happens here.
 
         Args:
             event: Authentication event to analyze
-            db: Database session
+            signals: Signals collected for this event, or None if the
+                user has no prior events
 
         Returns:
             FraudAssessment if BAML analysis succeeds, None if it fails or times out
@@ -163,56 +446,25 @@ class FraudDetector:
             return None
 
         try:
-            # Parse event timestamp
-            event_time = datetime.fromisoformat(event.timestamp.replace('Z', '+00:00'))
-            if event_time.tzinfo is not None:
-                event_time = event_time.replace(tzinfo=None)
-
-            # Gather contextual information for BAML agent
-            failed_logins = self._count_recent_events(
-                db=db,
-                user_id=event.user_id,
-                event_type="login_failure",
-                since=event_time - timedelta(minutes=5),
-                before=event_time
+            ip_changed = bool(
+                signals and event.ip_address and signals.prev_ip
+                and signals.prev_ip != event.ip_address
             )
-
-            failed_2fa = self._count_recent_events(
-                db=db,
-                user_id=event.user_id,
-                event_type="2fa_failure",
-                since=event_time - timedelta(minutes=5),
-                before=event_time
+            ua_changed = bool(
+                signals and event.user_agent and signals.prev_ua
+                and signals.prev_ua != event.user_agent
             )
 
-            ip_changed = False
-            if event.ip_address:
-                ip_changed = self._check_ip_change(
-                    db=db,
-                    user_id=event.user_id,
-                    current_ip=event.ip_address,
-                    before=event_time
-                )
-
-            ua_changed = False
-            if event.user_agent:
-                ua_changed = self._check_user_agent_change(
-                    db=db,
-                    user_id=event.user_id,
-                    current_ua=event.user_agent,
-                    before=event_time
-                )
-
             # Create BAML LoginEvent
             baml_event = BAMLLoginEvent(
                 user_id=event.user_id,
                 username=event.username,
                 ip_address=event.ip_address,
                 user_agent=event.user_agent,
-                timestamp=event.timestamp,
+                timestamp=event.timestamp.isoformat() + "Z",
                 event_type=event.event_type,
-                failed_attempts_5min=failed_logins,
-                failed_2fa_attempts_5min=failed_2fa,
+                failed_attempts_5min=signals.failed_logins if signals else 0,
+                failed_2fa_attempts_5min=signals.failed_2fa if signals else 0,
                 ip_changed=ip_changed,
                 user_agent_changed=ua_changed
             )
@@ -238,92 +490,57 @@ class FraudDetector:
             logger.error(f"Error during BAML analysis: {e}", exc_info=True)
             return None
 
-    def _rule_based_analysis(self, event: AuthEventIn, db: Session) -> FraudAssessment:
+    def _rule_based_analysis(
+        self,
+        event: AuthEventIn,
+        signals: Optional[FraudSignals]
+    ) -> FraudAssessment:
         """
         Perform rule-based fraud detection analysis.
 
-        Scoring rules:
-        - Multiple failed login attempts (3+ in 5 minutes): +0.3
-        - Multiple failed 2FA attempts (3+ in 5 minutes): +0.4
+        Pure evaluation over the pre-collected signals; no database work
+        happens here. The rules themselves live in the module-level
+        _COUNT_RULES and _CHANGE_RULES tables:
+        - Failed login attempts in 5 minutes: 3+ = +0.3, 6+ = +0.5, 11+ = +0.7
+        - Failed 2FA attempts in 5 minutes: 3+ = +0.4, 6+ = +0.6, 11+ = +0.8
         - IP address change from previous login: +0.2
         - User agent change from previous login: +0.1
 
         Args:
             event: Authentication event to analyze
-            db: Database session
+            signals: Signals collected for this event, or None if the
+                user has no prior events
 
         Returns:
             FraudAssessment with calculated risk score and reasoning
         """
+        # A user with no prior events cannot trigger any rule
+        if signals is None:
+            return FraudAssessment(
+                risk_score=0.0,
+                email_notification=False,
+                reason="Normal authentication pattern detected",
+                confidence=1.0
+            )
+
         risk_score = 0.0
         reasons = []
 
-        # Parse event timestamp (remove timezone info for comparison with database timestamps)
-        event_time = datetime.fromisoformat(event.timestamp.replace('Z', '+00:00'))
-        if event_time.tzinfo is not None:
-            event_time = event_time.replace(tzinfo=None)
-
-        # Rule 1: Multiple failed login attempts (3+ in 5 minutes)
-        # Scales with number of attempts: 3-5 attempts = +0.3, 6-10 = +0.5, 11+ = +0.7
-        failed_logins = self._count_recent_events(
-            db=db,
-            user_id=event.user_id,
-            event_type="login_failure",
-            since=event_time - timedelta(minutes=5),
-            before=event_time
-        )
-        if failed_logins >= 11:
-            risk_score += 0.7
-            reasons.append(f"Severe brute force attack detected ({failed_logins} failed logins in 5 minutes)")
-        elif failed_logins >= 6:
-            risk_score += 0.5
-            reasons.append(f"High number of failed login attempts ({failed_logins} in 5 minutes)")
-        elif failed_logins >= 3:
-            risk_score += 0.3
-            reasons.append(f"Multiple failed login attempts ({failed_logins} in 5 minutes)")
-
-        # Rule 2: Multiple failed 2FA attempts (3+ in 5 minutes)
-        # Scales with number of attempts: 3-5 attempts = +0.4, 6-10 = +0.6, 11+ = +0.8
-        failed_2fa = self._count_recent_events(
-            db=db,
-            user_id=event.user_id,
-            event_type="2fa_failure",
-            since=event_time - timedelta(minutes=5),
-            before=event_time
-        )
-        if failed_2fa >= 11:
-            risk_score += 0.8
-            reasons.append(f"Severe 2FA brute force attack ({failed_2fa} failed attempts in 5 minutes)")
-        elif failed_2fa >= 6:
-            risk_score += 0.6
-            reasons.append(f"High number of failed 2FA attempts ({failed_2fa} in 5 minutes)")
-        elif failed_2fa >= 3:
-            risk_score += 0.4
-            reasons.append(f"Multiple failed 2FA attempts ({failed_2fa} in 5 minutes)")
-
-        # Rule 3: IP address change from previous login
-        if event.ip_address:
-            ip_changed = self._check_ip_change(
-                db=db,
-                user_id=event.user_id,
-                current_ip=event.ip_address,
-                before=event_time
-            )
-            if ip_changed:
-                risk_score += 0.2
-                reasons.append("IP address changed from previous login")
-
-        # Rule 4: User agent change from previous login
-        if event.user_agent:
-            ua_changed = self._check_user_agent_change(
-                db=db,
-                user_id=event.user_id,
-                current_ua=event.user_agent,
-                before=event_time
-            )
-            if ua_changed:
-                risk_score += 0.1
-                reasons.append("User agent changed from previous login")
+        # At most one tier fires per counted signal
+        for attr, tiers in _COUNT_RULES:
+            count = getattr(signals, attr)
+            for threshold, weight, fmt in tiers:
+                if count >= threshold:
+                    risk_score += weight
+                    reasons.append(fmt.format(n=count))
+                    break
+
+        for event_attr, signal_attr, weight, reason in _CHANGE_RULES:
+            current = getattr(event, event_attr)
+            previous = getattr(signals, signal_attr)
+            if current and previous and previous != current:
+                risk_score += weight
+                reasons.append(reason)
 
         # Cap risk score at 1.0
         risk_score = min(risk_score, 1.0)
@@ -344,112 +561,131 @@ class FraudDetector:
             confidence=1.0
         )
 
-    def _count_recent_events(
+    def _has_prior_events(
         self,
         db: Session,
         user_id: int,
-        event_type: str,
-        since: datetime,
         before: datetime
-    ) -> int:
+    ) -> bool:
         """
-        Count events of a specific type for a user within a time window.
+        Check whether the user has any events before the given timestamp.
 
         Args:
             db: Database session
             user_id: User ID to query
-            event_type: Type of event to count
-            since: Start of time window
-            before: End of time window
+            before: Timestamp to query before
 
         Returns:
-            Number of matching events
+            True if prior events exist, False otherwise
         """
-        try:
-            count = db.query(MCPAuthEvent).filter(
-                MCPAuthEvent.user_id == user_id,
-                MCPAuthEvent.event_type == event_type,
-                MCPAuthEvent.timestamp >= since,
-                MCPAuthEvent.timestamp < before
-            ).count()
-            return count
-        except Exception as e:
-            logger.error(f"Error counting recent events: {e}")
-            return 0
+        return bool(
+            db.execute(
+                select(
+                    exists().where(
+                        MCPAuthEvent.user_id == user_id,
+                        MCPAuthEvent.timestamp < before
+                    )
+                )
+            ).scalar()
+        )
 
-    def _check_ip_change(
-        self,
-        db: Session,
-        user_id: int,
-        current_ip: str,
-        before: datetime
-    ) -> bool:
+    def _remember_login(self, event: AuthEventIn, event_time: datetime) -> None:
         """
-        Check if IP address has changed from the most recent successful login.
+        Record a successful login in the last-login cache.
 
-        Args:
-            db: Database session
-            user_id: User ID to query
-            current_ip: Current IP address
-            before: Timestamp to query before
+        Called after signals are collected so the event never serves as
+        its own previous login. Non-login_success events are ignored.
 
-        Returns:
-            True if IP has changed, False otherwise
+        Args:
+            event: The event just analyzed
+            event_time: Parsed timestamp of the event
         """
-        try:
-            # Get most recent successful login before this event
-            last_success = db.query(MCPAuthEvent).filter(
-                MCPAuthEvent.user_id == user_id,
-                MCPAuthEvent.event_type == "login_success",
-                MCPAuthEvent.timestamp < before,
-                MCPAuthEvent.ip_address.isnot(None)
-            ).order_by(MCPAuthEvent.timestamp.desc()).first()
+        if event.event_type != "login_success":
+            return
 
-            if last_success and last_success.ip_address:
-                return last_success.ip_address != current_ip
+        if len(self._last_login_cache) >= self.LAST_LOGIN_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (insertion-ordered dict)
+            self._last_login_cache.pop(next(iter(self._last_login_cache)))
 
-            # No previous login found, so no change detected
-            return False
-        except Exception as e:
-            logger.error(f"Error checking IP change: {e}")
-            return False
+        self._last_login_cache.pop(event.user_id, None)
+        self._last_login_cache[event.user_id] = (event.ip_address, event.user_agent, event_time)
 
-    def _check_user_agent_change(
+    def _collect_signals(
         self,
         db: Session,
         user_id: int,
-        current_ua: str,
-        before: datetime
-    ) -> bool:
+        before: datetime,
+        need_prev_login: bool = True
+    ) -> FraudSignals:
         """
-        Check if user agent has changed from the most recent successful login.
+        Gather everything the scoring rules need in one SQL round-trip.
+
+        Emits a single SELECT of four scalar subqueries: the 5-minute
+        failed-login and failed-2FA counts plus the IP and user agent of
+        the most recent successful login, replacing the former
+        one-query-per-rule pattern (4 round-trips per analysis).
 
         Args:
             db: Database session
             user_id: User ID to query
-            current_ua: Current user agent string
-            before: Timestamp to query before
+            before: Timestamp to query before (the event's own time)
+            need_prev_login: When False (the event carries neither IP nor
+                user agent, so the change rules cannot fire) the
+                previous-login lookup is skipped entirely
 
         Returns:
-            True if user agent has changed, False otherwise
+            FraudSignals for the user at the given point in time
         """
-        try:
-            # Get most recent successful login before this event
-            last_success = db.query(MCPAuthEvent).filter(
+        since = before - _FIVE_MIN
+
+        # The previous login only changes when a login_success is
+        # processed, so a cache hit drops the two ORDER BY ... LIMIT 1
+        # subqueries from the statement. Entries newer than the event
+        # (out-of-order delivery) or with missing fields fall back to SQL.
+        prev = None
+        cached_login = self._last_login_cache.get(user_id) if need_prev_login else None
+        if cached_login is not None:
+            cached_ip, cached_ua, cached_ts = cached_login
+            if cached_ts < before and cached_ip is not None and cached_ua is not None:
+                prev = (cached_ip, cached_ua)
+
+        def windowed_count(event_type):
+            return select(func.count()).where(
+                MCPAuthEvent.user_id == user_id,
+                MCPAuthEvent.event_type == event_type,
+                MCPAuthEvent.timestamp >= since,
+                MCPAuthEvent.timestamp < before
+            ).scalar_subquery()
+
+        def last_login_field(column):
+            return select(column).where(
                 MCPAuthEvent.user_id == user_id,
                 MCPAuthEvent.event_type == "login_success",
                 MCPAuthEvent.timestamp < before,
-                MCPAuthEvent.user_agent.isnot(None)
-            ).order_by(MCPAuthEvent.timestamp.desc()).first()
-
-            if last_success and last_success.user_agent:
-                return last_success.user_agent != current_ua
-
-            # No previous login found, so no change detected
-            return False
-        except Exception as e:
-            logger.error(f"Error checking user agent change: {e}")
-            return False
+                column.isnot(None)
+            ).order_by(MCPAuthEvent.timestamp.desc()).limit(1).scalar_subquery()
+
+        columns = [
+            windowed_count("login_failure"),
+            windowed_count("2fa_failure"),
+        ]
+        if need_prev_login and prev is None:
+            columns.append(last_login_field(MCPAuthEvent.ip_address))
+            columns.append(last_login_field(MCPAuthEvent.user_agent))
+
+        row = db.execute(select(*columns)).one()
+        if prev is not None:
+            prev_ip, prev_ua = prev
+        elif need_prev_login:
+            prev_ip, prev_ua = row[2], row[3]
+        else:
+            prev_ip = prev_ua = None
+        return FraudSignals(
+            failed_logins=row[0] or 0,
+            failed_2fa=row[1] or 0,
+            prev_ip=prev_ip,
+            prev_ua=prev_ua
+        )
 
     def get_recent_events(
         self,
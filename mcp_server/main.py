@@ -47,6 +47,11 @@ app.include_router(events.router)
 app.include_router(fraud_assessments.router)
 app.include_router(health.router)
 
+# Test-support endpoints are only registered when explicitly enabled
+if settings.TESTING_MODE:
+    from routes import test_support
+    app.include_router(test_support.router)
+
 
 @app.get("/")
 async def root():
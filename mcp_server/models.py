@@ -1,7 +1,7 @@
 """
 Database models for MCP Server
 """
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, Index
+from sqlalchemy import CheckConstraint, Column, String, Integer, Float, DateTime, Text, JSON, Index, text
 from datetime import datetime
 import uuid
 
@@ -34,11 +34,30 @@ class MCPAuthEvent(Base):
     fraud_reason = Column(Text, nullable=True)
     analyzed_at = Column(DateTime, nullable=True)
 
-    # Composite indexes for common queries
+    # Composite indexes for common queries, plus a CHECK keeping the
+    # event-type vocabulary closed at the database level (mirrors the
+    # AuthEventIn pattern validator)
     __table_args__ = (
+        CheckConstraint(
+            "event_type IN ('login_success', 'login_failure', '2fa_success', "
+            "'2fa_failure', 'password_reset', 'password_reset_request', "
+            "'account_locked', 'account_unlocked')",
+            name='ck_mcp_auth_events_event_type',
+        ),
         Index('ix_user_timestamp', 'user_id', 'timestamp'),
         Index('ix_risk_score', 'risk_score'),
         Index('ix_event_type_timestamp', 'event_type', 'timestamp'),
+        # Covers the fraud detector's windowed count and change-check
+        # queries (user_id and event_type equality plus timestamp range)
+        Index('ix_user_type_timestamp', 'user_id', 'event_type', 'timestamp'),
+        # Partial index serving the "most recent successful login" lookups
+        # behind the IP/user-agent change checks; only login_success rows
+        # are indexed, so the btree stays small under failure floods
+        Index(
+            'ix_user_prev_login', 'user_id', 'timestamp',
+            sqlite_where=text("event_type = 'login_success'"),
+            postgresql_where=text("event_type = 'login_success'"),
+        ),
     )
 
     def __repr__(self):
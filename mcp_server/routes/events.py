@@ -11,6 +11,7 @@ import logging
 from schemas import EventListResponse, AuthEventOut, ErrorResponse
 from models import MCPAuthEvent
 from db import get_db
+from routes.ingest import get_cached_event
 
 logger = logging.getLogger(__name__)
 
@@ -165,3 +166,89 @@ async def get_events(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to query events: {str(e)}"
         ) from e
+
+
+@router.get(
+    "/events/{event_id}",
+    response_model=AuthEventOut,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": "The requested authentication event",
+            "model": AuthEventOut
+        },
+        404: {
+            "description": "Event not found",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    },
+    summary="Get a single authentication event",
+    description="""
+    Retrieve one authentication event by its ID.
+
+    Events ingested within the last few seconds are served from an
+    in-memory cache, skipping the database read; set cached=false to
+    force a database lookup.
+    """
+)
+async def get_event(
+    event_id: str,
+    cached: bool = Query(True, description="Serve recently ingested events from the in-memory cache"),
+    db: Session = Depends(get_db)
+) -> AuthEventOut:
+    """
+    Get a single authentication event by ID.
+
+    Args:
+        event_id: Unique event ID
+        cached: Whether recently ingested events may be served from cache
+        db: Database session
+
+    Returns:
+        AuthEventOut for the requested event
+
+    Raises:
+        HTTPException: 404 if the event does not exist, 500 for server errors
+    """
+    try:
+        if cached:
+            event_out = get_cached_event(event_id)
+            if event_out is not None:
+                logger.debug(f"Serving event {event_id} from recent-events cache")
+                return event_out
+
+        event = db.query(MCPAuthEvent).filter(MCPAuthEvent.id == event_id).first()
+
+        if event is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Event not found: {event_id}"
+            )
+
+        return AuthEventOut(
+            id=event.id,
+            user_id=event.user_id,
+            username=event.username,
+            event_type=event.event_type,
+            ip_address=event.ip_address,
+            user_agent=event.user_agent,
+            timestamp=event.timestamp.isoformat() + 'Z' if event.timestamp else None,
+            metadata=event.event_metadata or {},
+            risk_score=event.risk_score,
+            fraud_reason=event.fraud_reason,
+            analyzed_at=event.analyzed_at.isoformat() + 'Z' if event.analyzed_at else None
+        )
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Failed to get event {event_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get event: {str(e)}"
+        ) from e
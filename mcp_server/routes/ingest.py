@@ -7,7 +7,14 @@ from datetime import datetime
 import logging
 import uuid
 
-from schemas import AuthEventIn, EventIngestResponse, ErrorResponse
+from schemas import (
+    AuthEventIn,
+    AuthEventOut,
+    BulkEventIngestIn,
+    BulkEventIngestResponse,
+    EventIngestResponse,
+    ErrorResponse
+)
 from models import MCPAuthEvent
 from db import get_db
 from fraud_detector import FraudDetector
@@ -15,6 +22,34 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of freshly ingested events keyed by event id, so a
+# read-back immediately after ingest can skip the SELECT round-trip
+RECENT_EVENTS_TTL_SECONDS = 10
+RECENT_EVENTS_MAX_ENTRIES = 1024
+_recent_events = {}
+
+
+def cache_recent_event(event_out: AuthEventOut) -> None:
+    """Remember a just-ingested event for quick read-back"""
+    if len(_recent_events) >= RECENT_EVENTS_MAX_ENTRIES:
+        # Evict the oldest entry (insertion-ordered dict)
+        _recent_events.pop(next(iter(_recent_events)))
+    _recent_events[event_out.id] = (event_out, datetime.utcnow())
+
+
+def get_cached_event(event_id: str):
+    """Return a recently ingested event if still within the TTL"""
+    entry = _recent_events.get(event_id)
+    if entry is None:
+        return None
+
+    event_out, cached_at = entry
+    if (datetime.utcnow() - cached_at).total_seconds() >= RECENT_EVENTS_TTL_SECONDS:
+        del _recent_events[event_id]
+        return None
+
+    return event_out
+
 # Initialize fraud detector with configured threshold and BAML settings
 fraud_detector = FraudDetector(
     fraud_threshold=settings.FRAUD_THRESHOLD,
@@ -25,6 +60,34 @@ fraud_detector = FraudDetector(
 router = APIRouter(prefix="/mcp", tags=["Event Ingestion"])
 
 
+def _log_assessment(event: AuthEventIn, event_id: str, assessment) -> None:
+    """
+    Log fraud analysis results for an ingested event, including the
+    high-risk / email-notification markers monitoring watches for.
+
+    Args:
+        event: The analyzed event
+        event_id: ID assigned at ingestion
+        assessment: FraudAssessment from the detector
+    """
+    logger.info(
+        f"Fraud analysis completed for event {event_id}: "
+        f"risk_score={assessment.risk_score:.2f}"
+    )
+
+    # Log high-risk events for future AI analysis
+    if assessment.risk_score >= settings.FRAUD_THRESHOLD:
+        logger.warning(
+            f"⚠️ HIGH RISK EVENT DETECTED: event_id={event_id}, "
+            f"user_id={event.user_id}, username={event.username}, "
+            f"risk_score={assessment.risk_score:.2f}, reason={assessment.reason}"
+        )
+        logger.warning(
+            f"📧 EMAIL NOTIFICATION TRIGGER: Would send email to user {event.username} "
+            f"about suspicious activity. Risk: {assessment.risk_score:.2f} - {assessment.reason}"
+        )
+
+
 @router.post(
     "/ingest",
     response_model=EventIngestResponse,
@@ -81,15 +144,9 @@ async def ingest_event(
         HTTPException: 422 for validation errors, 500 for server errors
     """
     try:
-        # Parse timestamp to datetime object
-        try:
-            event_timestamp = datetime.fromisoformat(event.timestamp.replace('Z', '+00:00'))
-        except (ValueError, AttributeError) as e:
-            logger.error(f"Invalid timestamp format: {event.timestamp}")
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Invalid timestamp format: {str(e)}"
-            ) from e
+        # Timestamp is already a naive datetime, parsed and validated by
+        # the AuthEventIn schema
+        event_timestamp = event.timestamp
 
         # Generate unique event ID
         event_id = str(uuid.uuid4())
@@ -110,48 +167,53 @@ async def ingest_event(
             analyzed_at=None
         )
 
-        # Persist event to database
+        # Stage the event; it is committed together with the fraud
+        # analysis results below so one commit (one fsync) covers both
         db.add(mcp_event)
-        db.commit()
-        db.refresh(mcp_event)
-
-        logger.info(
-            f"Event ingested successfully: id={event_id}, user_id={event.user_id}, "
-            f"event_type={event.event_type}"
-        )
 
         # Perform fraud detection analysis
+        assessment = None
+        analyzed_at = None
         try:
             assessment = fraud_detector.analyze_event(event, db)
 
             # Update event with fraud detection results
+            analyzed_at = datetime.utcnow()
             mcp_event.risk_score = assessment.risk_score
             mcp_event.fraud_reason = assessment.reason
-            mcp_event.analyzed_at = datetime.utcnow()
+            mcp_event.analyzed_at = analyzed_at
 
-            db.commit()
+        except Exception as e:
+            # Log fraud detection errors but don't fail the ingestion;
+            # the event itself is still committed below
+            logger.error(f"Fraud detection failed for event {event_id}: {e}", exc_info=True)
 
-            logger.info(
-                f"Fraud analysis completed for event {event_id}: "
-                f"risk_score={assessment.risk_score:.2f}"
-            )
+        # Single transaction: event insert plus analysis results
+        db.commit()
 
-            # Log high-risk events for future AI analysis
-            if assessment.risk_score >= settings.FRAUD_THRESHOLD:
-                logger.warning(
-                    f"⚠️ HIGH RISK EVENT DETECTED: event_id={event_id}, "
-                    f"user_id={event.user_id}, username={event.username}, "
-                    f"risk_score={assessment.risk_score:.2f}, reason={assessment.reason}"
-                )
-                logger.warning(
-                    f"📧 EMAIL NOTIFICATION TRIGGER: Would send email to user {event.username} "
-                    f"about suspicious activity. Risk: {assessment.risk_score:.2f} - {assessment.reason}"
-                )
+        logger.info(
+            f"Event ingested successfully: id={event_id}, user_id={event.user_id}, "
+            f"event_type={event.event_type}"
+        )
 
-        except Exception as e:
-            # Log fraud detection errors but don't fail the ingestion
-            logger.error(f"Fraud detection failed for event {event_id}: {e}", exc_info=True)
-            # Continue without fraud analysis results
+        # Snapshot the committed event for cached read-back via
+        # GET /mcp/events/{event_id}
+        cache_recent_event(AuthEventOut(
+            id=event_id,
+            user_id=event.user_id,
+            username=event.username,
+            event_type=event.event_type,
+            ip_address=event.ip_address,
+            user_agent=event.user_agent,
+            timestamp=event_timestamp.isoformat() + 'Z',
+            metadata=event.metadata or {},
+            risk_score=assessment.risk_score if assessment else None,
+            fraud_reason=assessment.reason if assessment else None,
+            analyzed_at=analyzed_at.isoformat() + 'Z' if analyzed_at else None
+        ))
+
+        if assessment is not None:
+            _log_assessment(event, event_id, assessment)
 
         return EventIngestResponse(
             message="Event accepted for processing",
@@ -171,3 +233,119 @@ async def ingest_event(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process event: {str(e)}"
         ) from e
+
+
+@router.post(
+    "/ingest/bulk",
+    response_model=BulkEventIngestResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        201: {
+            "description": "All events accepted and analyzed",
+            "model": BulkEventIngestResponse
+        },
+        422: {
+            "description": "Invalid event structure",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    },
+    summary="Ingest a batch of authentication events",
+    description="""
+    Receive and store a batch of authentication events in one request.
+
+    The whole batch is inserted with a single executemany INSERT, then
+    analyzed in one batched fraud pass that collects history signals
+    once per distinct user (sampled at that user's latest event in the
+    batch) rather than once per event, and committed once. Compared to
+    ingesting the same events one by one this replaces N HTTP round
+    trips, N signal queries and N commits with one request, one signal
+    query per user and one commit.
+    """
+)
+async def ingest_events_bulk(
+    request: BulkEventIngestIn,
+    db: Session = Depends(get_db)
+) -> BulkEventIngestResponse:
+    """
+    Ingest a batch of authentication events.
+
+    Args:
+        request: Batch of events to ingest
+        db: Database session
+
+    Returns:
+        BulkEventIngestResponse with the assigned event IDs
+
+    Raises:
+        HTTPException: 422 for validation errors, 500 for server errors
+    """
+    try:
+        parsed = []
+        rows = []
+        for event in request.events:
+            event_id = str(uuid.uuid4())
+            parsed.append((event, event_id))
+            rows.append({
+                "id": event_id,
+                "user_id": event.user_id,
+                "username": event.username,
+                "event_type": event.event_type,
+                "ip_address": event.ip_address,
+                "user_agent": event.user_agent,
+                "timestamp": event.timestamp,
+                "event_metadata": event.metadata,
+                "risk_score": None,
+                "fraud_reason": None,
+                "analyzed_at": None,
+            })
+
+        # One executemany INSERT for the whole batch
+        db.bulk_insert_mappings(MCPAuthEvent, rows)
+
+        # One batched analysis pass over the now-complete batch: signals
+        # are collected once per distinct user instead of once per event;
+        # failures are logged but do not fail the ingestion, same as
+        # single ingest
+        try:
+            assessments = fraud_detector.analyze_event_batch(
+                [event for event, _ in parsed], db
+            )
+        except Exception as e:
+            logger.error(f"Fraud detection failed for event batch: {e}", exc_info=True)
+            assessments = []
+
+        for (event, event_id), assessment in zip(parsed, assessments):
+            db.query(MCPAuthEvent).filter(MCPAuthEvent.id == event_id).update({
+                "risk_score": assessment.risk_score,
+                "fraud_reason": assessment.reason,
+                "analyzed_at": datetime.utcnow(),
+            })
+            _log_assessment(event, event_id, assessment)
+
+        # Single transaction covers the batch and all analysis results
+        db.commit()
+
+        logger.info(f"Bulk ingest successful: {len(rows)} events accepted")
+
+        return BulkEventIngestResponse(
+            message=f"{len(rows)} events accepted for processing",
+            event_ids=[event_id for _, event_id in parsed],
+            status="accepted"
+        )
+
+    except HTTPException:
+        # Re-raise HTTP exceptions (validation errors)
+        raise
+
+    except Exception as e:
+        # Log unexpected errors and return 500
+        logger.error(f"Failed to ingest event batch: {str(e)}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process event batch: {str(e)}"
+        ) from e
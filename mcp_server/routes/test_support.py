@@ -0,0 +1,190 @@
+"""
+Test-support API endpoints, registered only when TESTING_MODE is enabled
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import logging
+import uuid
+
+from schemas import AuthEventIn, BulkLoginFailureIn, BulkLoginFailureResponse, ErrorResponse
+from models import MCPAuthEvent
+from db import get_db
+from routes.ingest import fraud_detector
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/mcp/test", tags=["Test Support"])
+
+# Gap between simulated attempts; keeps a 100-event burst inside the
+# detector's 5-minute window
+ATTEMPT_SPACING_SECONDS = 2
+
+
+@router.post(
+    "/bulk-login-failure",
+    response_model=BulkLoginFailureResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        201: {
+            "description": "Simulated brute-force burst inserted",
+            "model": BulkLoginFailureResponse
+        },
+        422: {
+            "description": "Invalid request structure",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    },
+    summary="Insert a burst of login_failure events (test only)",
+    description="""
+    Insert N login_failure events for one user in a single transaction and
+    run fraud analysis on the final event of the burst.
+
+    E2E tests use this instead of issuing N sequential login requests, so
+    the brute-force phase costs one HTTP round-trip and one commit rather
+    than N of each. The endpoint is only registered when TESTING_MODE is
+    enabled and must never be exposed in production.
+    """
+)
+async def bulk_login_failure(
+    request: BulkLoginFailureIn,
+    db: Session = Depends(get_db)
+) -> BulkLoginFailureResponse:
+    """
+    Insert a brute-force burst of login_failure events in one transaction.
+
+    Args:
+        request: User identity and number of events to insert
+        db: Database session
+
+    Returns:
+        BulkLoginFailureResponse with the inserted event IDs and the risk
+        score assigned to the final event
+
+    Raises:
+        HTTPException: 422 for validation errors, 500 for server errors
+    """
+    try:
+        now = datetime.utcnow()
+
+        # Oldest first, evenly spaced, with the final attempt at "now" so
+        # every earlier attempt falls inside the fraud window
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": request.user_id,
+                "username": request.username,
+                "event_type": "login_failure",
+                "ip_address": request.ip_address,
+                "user_agent": request.user_agent,
+                "timestamp": now - timedelta(seconds=ATTEMPT_SPACING_SECONDS * (request.count - 1 - i)),
+                "event_metadata": {},
+                "risk_score": None,
+                "fraud_reason": None,
+                "analyzed_at": None,
+            }
+            for i in range(request.count)
+        ]
+
+        # One executemany INSERT instead of per-event unit-of-work flushes
+        db.bulk_insert_mappings(MCPAuthEvent, rows)
+
+        # Analyze the final event of the burst so a fraud assessment exists
+        # for the attack, exactly as it would after a real 12th attempt
+        last_row = rows[-1]
+        assessment = fraud_detector.analyze_event(
+            AuthEventIn(
+                user_id=request.user_id,
+                username=request.username,
+                event_type="login_failure",
+                ip_address=request.ip_address,
+                user_agent=request.user_agent,
+                timestamp=last_row["timestamp"].isoformat() + 'Z',
+            ),
+            db
+        )
+
+        db.query(MCPAuthEvent).filter(MCPAuthEvent.id == last_row["id"]).update({
+            "risk_score": assessment.risk_score,
+            "fraud_reason": assessment.reason,
+            "analyzed_at": datetime.utcnow(),
+        })
+
+        # Single transaction covers the burst and the analysis results
+        db.commit()
+
+        logger.info(
+            "Bulk login-failure burst inserted: user_id=%s, count=%s, risk_score=%.2f",
+            request.user_id, request.count, assessment.risk_score
+        )
+
+        return BulkLoginFailureResponse(
+            message=f"Inserted {request.count} login_failure events",
+            event_ids=[row["id"] for row in rows],
+            risk_score=assessment.risk_score
+        )
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Failed to insert bulk login failures: {str(e)}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to insert bulk login failures: {str(e)}"
+        ) from e
+
+
+@router.post(
+    "/reset",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"description": "All auth events deleted"},
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    },
+    summary="Delete all stored auth events (test only)",
+    description="""
+    Truncate the auth-event table so integration tests can share one
+    long-lived server (or container) while keeping data isolation
+    between tests, instead of restarting the server per test.
+
+    Only registered when TESTING_MODE is enabled; must never be exposed
+    in production.
+    """
+)
+async def reset_events(db: Session = Depends(get_db)):
+    """
+    Delete every stored auth event in a single bulk DELETE.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dict with the number of deleted events
+
+    Raises:
+        HTTPException: 500 for server errors
+    """
+    try:
+        deleted = db.query(MCPAuthEvent).delete()
+        db.commit()
+
+        logger.info("Test reset: deleted %s auth events", deleted)
+
+        return {"message": "All auth events deleted", "deleted_events": deleted}
+
+    except Exception as e:
+        logger.error(f"Failed to reset auth events: {str(e)}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reset auth events: {str(e)}"
+        ) from e
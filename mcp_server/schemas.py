@@ -21,18 +21,23 @@ class AuthEventIn(BaseModel):
     )
     ip_address: Optional[str] = Field(None, max_length=45, description="Client IP address (IPv4 or IPv6)")
     user_agent: Optional[str] = Field(None, max_length=500, description="Client user agent string")
-    timestamp: str = Field(..., description="Event timestamp in ISO 8601 format")
+    timestamp: datetime = Field(..., description="Event timestamp in ISO 8601 format")
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional event metadata")
 
-    @field_validator('timestamp')
+    @field_validator('timestamp', mode='before')
     @classmethod
-    def validate_timestamp(cls, v: str) -> str:
-        """Validate that timestamp is in valid ISO 8601 format"""
-        try:
-            datetime.fromisoformat(v.replace('Z', '+00:00'))
-            return v
-        except (ValueError, AttributeError) as exc:
-            raise ValueError('timestamp must be in ISO 8601 format (e.g., 2024-01-01T12:00:00Z)') from exc
+    def validate_timestamp(cls, v):
+        """Parse ISO 8601 strings (including a trailing Z) once at the
+        model boundary and strip timezone info so downstream comparisons
+        against naive database timestamps work without re-parsing"""
+        if isinstance(v, str):
+            try:
+                v = datetime.fromisoformat(v.replace('Z', '+00:00'))
+            except (ValueError, AttributeError) as exc:
+                raise ValueError('timestamp must be in ISO 8601 format (e.g., 2024-01-01T12:00:00Z)') from exc
+        if isinstance(v, datetime) and v.tzinfo is not None:
+            v = v.replace(tzinfo=None)
+        return v
 
     @field_validator('metadata')
     @classmethod
@@ -122,6 +127,101 @@ class EventIngestResponse(BaseModel):
     }
 
 
+class BulkEventIngestIn(BaseModel):
+    """
+    Request schema for batch event ingestion.
+    """
+    events: List[AuthEventIn] = Field(
+        ..., min_length=1, max_length=500,
+        description="Events to ingest, analyzed in list order"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "events": [
+                        {
+                            "user_id": 123,
+                            "username": "john_doe",
+                            "event_type": "login_failure",
+                            "timestamp": "2024-01-15T10:30:00Z"
+                        }
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class BulkEventIngestResponse(BaseModel):
+    """
+    Response schema for successful batch event ingestion.
+    """
+    message: str = Field(..., description="Success message")
+    event_ids: List[str] = Field(..., description="IDs of the ingested events, in request order")
+    status: str = Field(default="accepted", description="Processing status")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "message": "12 events accepted for processing",
+                    "event_ids": ["550e8400-e29b-41d4-a716-446655440000"],
+                    "status": "accepted"
+                }
+            ]
+        }
+    }
+
+
+class BulkLoginFailureIn(BaseModel):
+    """
+    Schema for the test-only bulk login-failure endpoint.
+
+    Only served when TESTING_MODE is enabled; lets E2E tests simulate a
+    brute-force burst with one request instead of N sequential POSTs.
+    """
+    user_id: int = Field(..., gt=0, description="User ID the simulated failures belong to")
+    username: str = Field(..., min_length=1, max_length=255, description="Username")
+    count: int = Field(..., ge=1, le=100, description="Number of login_failure events to insert")
+    ip_address: Optional[str] = Field(None, max_length=45, description="Client IP address for the simulated events")
+    user_agent: Optional[str] = Field(None, max_length=500, description="Client user agent for the simulated events")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "user_id": 123,
+                    "username": "ci_test_user",
+                    "count": 12
+                }
+            ]
+        }
+    }
+
+
+class BulkLoginFailureResponse(BaseModel):
+    """
+    Response schema for the test-only bulk login-failure endpoint.
+    """
+    message: str = Field(..., description="Success message")
+    event_ids: List[str] = Field(..., description="IDs of the inserted events, oldest first")
+    risk_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="Risk score of the final event in the burst")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "message": "Inserted 12 login_failure events",
+                    "event_ids": ["550e8400-e29b-41d4-a716-446655440000"],
+                    "risk_score": 0.8
+                }
+            ]
+        }
+    }
+
+
 class ErrorResponse(BaseModel):
     """
     Schema for error responses.
@@ -1,25 +1,105 @@
 """
 Test script for fraud detection engine (Task 5)
 """
+import itertools
+import json
+import logging
 import sys
 from datetime import datetime, timedelta
-import uuid
+from pathlib import Path
 
-sys.path.insert(0, '.')
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
 
 from fastapi.testclient import TestClient
-from mcp_server.main import app
-from mcp_server.db import SessionLocal
-from mcp_server.models import MCPAuthEvent
-from mcp_server.fraud_detector import FraudDetector, FraudAssessment
-from mcp_server.schemas import AuthEventIn
+from freezegun import freeze_time
+from sqlalchemy import event as sa_event, insert, text
+
+from main import app
+from db import SessionLocal
+from models import MCPAuthEvent
+from fraud_detector import FraudDetector, FraudAssessment
+from schemas import AuthEventIn
 
+logger = logging.getLogger(__name__)
+
+# TestClient and FraudDetector are constructed once and shared by all tests
 client = TestClient(app)
+DETECTOR = FraudDetector(fraud_threshold=0.7)
+
+# Fixed reference time shared by all tests; the autouse freeze fixture
+# pins datetime.utcnow() to it so window boundaries are deterministic
+# instead of racing the wall clock by microseconds
+FROZEN_TIME = "2024-01-15T10:00:00"
+BASE_TIME = datetime.fromisoformat(FROZEN_TIME)
+BASE_TIME_ISO = BASE_TIME.isoformat() + "Z"
+_MIN = [timedelta(minutes=i) for i in range(10)]
+_HOUR = [timedelta(hours=i) for i in range(5)]
+
+# Pre-serialized ingest payload so the JSON encode cost is paid once at
+# import instead of inside the request loop
+_JSON_HEADERS = {"content-type": "application/json"}
+INGEST_PAYLOAD = json.dumps({
+    "user_id": 5007,
+    "username": "test_user_5007",
+    "event_type": "login_success",
+    "ip_address": "192.168.1.100",
+    "user_agent": "Mozilla/5.0",
+    "timestamp": BASE_TIME_ISO,
+    "metadata": {}
+}).encode()
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Single shared database session for the whole module.
+
+    Opening one session up front avoids paying the pool checkout and
+    dialect setup cost once per test.
+    """
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def _frozen_clock():
+    """Freeze time so every clock read inside a test sees BASE_TIME"""
+    with freeze_time(FROZEN_TIME):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _isolate_test(db):
+    """Wrap each test in a SAVEPOINT so seeded events do not leak between tests"""
+    nested = db.begin_nested()
+    yield
+    if nested.is_active:
+        nested.rollback()
+    db.rollback()
+
+
+def _get_events_by_id(db, event_ids):
+    """Fetch ingested events in a single IN query, keyed by event id.
+
+    Verification reads batch through one round trip regardless of how
+    many events a test ingests.
+    """
+    rows = db.query(MCPAuthEvent).filter(MCPAuthEvent.id.in_(event_ids)).all()
+    return {row.id: row for row in rows}
+
+
+_id_counter = itertools.count()
 
 
 def generate_unique_id(prefix: str) -> str:
-    """Generate unique ID for test events"""
-    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+    """Generate unique ID for test events.
+
+    A monotonic counter is enough here: ids only need to be unique within
+    one test process, and it avoids the urandom syscall uuid4 makes.
+    """
+    return f"{prefix}-{next(_id_counter):08x}"
 
 
 def setup_test_events(db, user_id: int, base_time: datetime):
@@ -35,38 +115,38 @@ def setup_test_events(db, user_id: int, base_time: datetime):
             event_type="login_success",
             ip_address="192.168.1.100",
             user_agent="Mozilla/5.0 (Windows NT 10.0)",
-            timestamp=base_time - timedelta(hours=i+1),
+            timestamp=base_time - _HOUR[i + 1],
             event_metadata={}
         )
         db.add(event)
         events.append(event)
 
-    db.commit()
+    db.flush()
     return events
 
 
 def test_fraud_assessment_model():
     """Test FraudAssessment model creation"""
-    print("\n✓ Test FraudAssessment Model")
+    logger.debug("Test FraudAssessment Model")
 
     assessment = FraudAssessment(
         risk_score=0.8,
-        alert=True,
+        email_notification=True,
         reason="Test reason",
         confidence=1.0
     )
 
     assert assessment.risk_score == 0.8
-    assert assessment.alert is True
+    assert assessment.email_notification is True
     assert assessment.reason == "Test reason"
     assert assessment.confidence == 1.0
 
-    print("  Verified: FraudAssessment model works correctly")
+    logger.debug("Verified: FraudAssessment model works correctly")
 
 
 def test_fraud_detector_initialization():
     """Test FraudDetector initialization"""
-    print("\n✓ Test FraudDetector Initialization")
+    logger.debug("Test FraudDetector Initialization")
 
     detector = FraudDetector(fraud_threshold=0.7)
     assert detector.fraud_threshold == 0.7
@@ -74,196 +154,101 @@ def test_fraud_detector_initialization():
     detector2 = FraudDetector(fraud_threshold=0.5)
     assert detector2.fraud_threshold == 0.5
 
-    print("  Verified: FraudDetector initializes with custom threshold")
-
-
-def test_rule_multiple_failed_logins():
-    """Test Rule: Multiple failed login attempts (3+ in 5 minutes): +0.3"""
-    print("\n✓ Test Rule: Multiple Failed Login Attempts")
-
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
+    logger.debug("Verified: FraudDetector initializes with custom threshold")
+
+
+def _seed_events(db, user_id: int, event_type: str, count: int, base_time: datetime):
+    """Seed events for a rule scenario in one bulk save"""
+    if event_type == "login_success":
+        # A single previous successful login an hour ago
+        events = [
+            MCPAuthEvent(
+                id=generate_unique_id(f"prev-login-{user_id}"),
+                user_id=user_id,
+                username=f"test_user_{user_id}",
+                event_type="login_success",
+                ip_address="192.168.1.100",
+                user_agent="Mozilla/5.0 (Windows NT 10.0)",
+                timestamp=base_time - _HOUR[1],
+                event_metadata={}
+            )
+        ]
+    else:
+        # A burst of failures inside the 5-minute detection window
+        events = [
+            MCPAuthEvent(
+                id=generate_unique_id(f"{event_type}-{user_id}"),
+                user_id=user_id,
+                username=f"test_user_{user_id}",
+                event_type=event_type,
+                ip_address="192.168.1.100",
+                user_agent="Mozilla/5.0 (Windows NT 10.0)",
+                timestamp=base_time - _MIN[i + 1],
+                event_metadata={}
+            )
+            for i in range(count)
+        ]
+    db.bulk_save_objects(events)
+    db.flush()
+
+
+@pytest.mark.parametrize(
+    "seed_event_type, seed_count, new_event_overrides, min_score, reason_substr",
+    [
+        # Rule: Multiple failed login attempts (3+ in 5 minutes): +0.3
+        ("login_failure", 4, {}, 0.3, "failed login attempts"),
+        # Rule: Multiple failed 2FA attempts (3+ in 5 minutes): +0.4
+        ("2fa_failure", 3, {"event_type": "2fa_success"}, 0.4, "2fa"),
+        # Rule: IP address change from previous login: +0.2
+        ("login_success", 1, {"ip_address": "10.0.0.50"}, 0.2, "ip address changed"),
+        # Rule: User agent change from previous login: +0.1
+        ("login_success", 1, {"user_agent": "Chrome/91.0 (Macintosh)"}, 0.1, "user agent changed"),
+    ],
+    ids=["failed-logins", "failed-2fa", "ip-change", "ua-change"],
+)
+@pytest.mark.xdist_group(name="user-5001")
+def test_rule_scoring(db, seed_event_type, seed_count, new_event_overrides, min_score, reason_substr):
+    """Test each rule-based scoring rule against its seeded scenario"""
+    logger.debug(f"Test Rule: {reason_substr}")
+
+    detector = DETECTOR
 
     user_id = 5001
-    base_time = datetime.utcnow()
-
-    # Create 4 failed login attempts in the last 5 minutes
-    for i in range(4):
-        event = MCPAuthEvent(
-            id=generate_unique_id(f"failed-login-{user_id}"),
-            user_id=user_id,
-            username=f"test_user_{user_id}",
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=i),
-            event_metadata={}
-        )
-        db.add(event)
-    db.commit()
-
-    # Analyze a new event
-    new_event = AuthEventIn(
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
-        timestamp=base_time.isoformat() + "Z",
-        metadata={}
-    )
-
-    assessment = detector.analyze_event(new_event, db)
-
-    assert assessment.risk_score >= 0.3, f"Risk score should be at least 0.3, got {assessment.risk_score}"
-    assert "failed login attempts" in assessment.reason.lower()
-
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
-
-
-def test_rule_multiple_failed_2fa():
-    """Test Rule: Multiple failed 2FA attempts (3+ in 5 minutes): +0.4"""
-    print("\n✓ Test Rule: Multiple Failed 2FA Attempts")
-
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
-
-    user_id = 5002
-    base_time = datetime.utcnow()
-
-    # Create 3 failed 2FA attempts in the last 5 minutes
-    for i in range(3):
-        event = MCPAuthEvent(
-            id=generate_unique_id(f"failed-2fa-{user_id}"),
-            user_id=user_id,
-            username=f"test_user_{user_id}",
-            event_type="2fa_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=i),
-            event_metadata={}
-        )
-        db.add(event)
-    db.commit()
-
-    # Analyze a new event
-    new_event = AuthEventIn(
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="2fa_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
-        timestamp=base_time.isoformat() + "Z",
-        metadata={}
-    )
-
-    assessment = detector.analyze_event(new_event, db)
-
-    assert assessment.risk_score >= 0.4, f"Risk score should be at least 0.4, got {assessment.risk_score}"
-    assert "2fa" in assessment.reason.lower()
-
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
-
-
-def test_rule_ip_address_change():
-    """Test Rule: IP address change from previous login: +0.2"""
-    print("\n✓ Test Rule: IP Address Change")
-
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
-
-    user_id = 5003
-    base_time = datetime.utcnow()
-
-    # Create a previous successful login with different IP
-    prev_event = MCPAuthEvent(
-        id=generate_unique_id(f"prev-login-{user_id}"),
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
-        timestamp=base_time - timedelta(hours=1),
-        event_metadata={}
-    )
-    db.add(prev_event)
-    db.commit()
-
-    # Analyze a new event with different IP
-    new_event = AuthEventIn(
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="10.0.0.50",  # Different IP
-        user_agent="Mozilla/5.0",
-        timestamp=base_time.isoformat() + "Z",
-        metadata={}
-    )
-
-    assessment = detector.analyze_event(new_event, db)
+    base_time = BASE_TIME
 
-    assert assessment.risk_score >= 0.2, f"Risk score should be at least 0.2, got {assessment.risk_score}"
-    assert "ip address changed" in assessment.reason.lower()
+    _seed_events(db, user_id, seed_event_type, seed_count, base_time)
 
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
-
-
-def test_rule_user_agent_change():
-    """Test Rule: User agent change from previous login: +0.1"""
-    print("\n✓ Test Rule: User Agent Change")
-
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
-
-    user_id = 5004
-    base_time = datetime.utcnow()
-
-    # Create a previous successful login with different user agent
-    prev_event = MCPAuthEvent(
-        id=generate_unique_id(f"prev-login-{user_id}"),
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0 (Windows NT 10.0)",
-        timestamp=base_time - timedelta(hours=1),
-        event_metadata={}
-    )
-    db.add(prev_event)
-    db.commit()
-
-    # Analyze a new event with different user agent
-    new_event = AuthEventIn(
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Chrome/91.0 (Macintosh)",  # Different user agent
-        timestamp=base_time.isoformat() + "Z",
-        metadata={}
-    )
+    # Analyze a new event, varying only the fields the rule looks at
+    event_fields = {
+        "user_id": user_id,
+        "username": f"test_user_{user_id}",
+        "event_type": "login_success",
+        "ip_address": "192.168.1.100",
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0)",
+        "timestamp": BASE_TIME_ISO,
+        "metadata": {}
+    }
+    event_fields.update(new_event_overrides)
+    new_event = AuthEventIn(**event_fields)
 
     assessment = detector.analyze_event(new_event, db)
 
-    assert assessment.risk_score >= 0.1, f"Risk score should be at least 0.1, got {assessment.risk_score}"
-    assert "user agent changed" in assessment.reason.lower()
+    assert assessment.risk_score >= min_score, \
+        f"Risk score should be at least {min_score}, got {assessment.risk_score}"
+    assert reason_substr in assessment.reason.lower()
 
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
+    logger.debug(f"Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
 
 
-def test_combined_rules():
+@pytest.mark.xdist_group(name="user-5005")
+def test_combined_rules(db):
     """Test multiple rules triggering together"""
-    print("\n✓ Test Combined Rules")
+    logger.debug("Test Combined Rules")
 
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
+    detector = DETECTOR
 
     user_id = 5005
-    base_time = datetime.utcnow()
+    base_time = BASE_TIME
 
     # Create previous successful login
     prev_event = MCPAuthEvent(
@@ -273,7 +258,7 @@ def test_combined_rules():
         event_type="login_success",
         ip_address="192.168.1.100",
         user_agent="Mozilla/5.0 (Windows NT 10.0)",
-        timestamp=base_time - timedelta(hours=1),
+        timestamp=base_time - _HOUR[1],
         event_metadata={}
     )
     db.add(prev_event)
@@ -287,12 +272,12 @@ def test_combined_rules():
             event_type="login_failure",
             ip_address="192.168.1.100",
             user_agent="Mozilla/5.0 (Windows NT 10.0)",
-            timestamp=base_time - timedelta(minutes=i),
+            timestamp=base_time - _MIN[i],
             event_metadata={}
         )
         db.add(event)
 
-    db.commit()
+    db.flush()
 
     # Analyze new event with IP and UA change
     new_event = AuthEventIn(
@@ -301,7 +286,7 @@ def test_combined_rules():
         event_type="login_success",
         ip_address="10.0.0.50",  # Different IP
         user_agent="Chrome/91.0",  # Different UA
-        timestamp=base_time.isoformat() + "Z",
+        timestamp=BASE_TIME_ISO,
         metadata={}
     )
 
@@ -313,63 +298,65 @@ def test_combined_rules():
     assert "ip address" in assessment.reason.lower()
     assert "user agent" in assessment.reason.lower()
 
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
+    logger.debug(f"Verified: Risk score = {assessment.risk_score:.2f}, Reason: {assessment.reason}")
 
 
-def test_alert_threshold():
-    """Test that alert flag is set when risk_score >= threshold"""
-    print("\n✓ Test Alert Threshold")
+@pytest.mark.xdist_group(name="user-5006")
+def test_alert_threshold(db):
+    """Test that email notification flag is set when risk_score >= threshold"""
+    logger.debug("Test Alert Threshold")
 
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
+    detector = DETECTOR
 
     user_id = 5006
-    base_time = datetime.utcnow()
-
-    # Create scenario that triggers high risk score
-    # Previous successful login with original IP/UA
-    prev_event = MCPAuthEvent(
-        id=generate_unique_id(f"prev-login-{user_id}"),
-        user_id=user_id,
-        username=f"test_user_{user_id}",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
-        timestamp=base_time - timedelta(hours=1),
-        event_metadata={}
-    )
-    db.add(prev_event)
-
+    base_time = BASE_TIME
+
+    # Create scenario that triggers high risk score, seeded through the
+    # Core insert path: one compiled INSERT with eight parameter sets
+    # instead of eight instrumented ORM adds
+    rows = [
+        # Previous successful login with original IP/UA
+        {
+            "id": generate_unique_id(f"prev-login-{user_id}"),
+            "user_id": user_id,
+            "username": f"test_user_{user_id}",
+            "event_type": "login_success",
+            "ip_address": "192.168.1.100",
+            "user_agent": "Mozilla/5.0",
+            "timestamp": base_time - _HOUR[1],
+            "event_metadata": {}
+        }
+    ]
     # Multiple failed logins with new IP/UA
-    for i in range(4):
-        event = MCPAuthEvent(
-            id=generate_unique_id(f"failed-login-{user_id}"),
-            user_id=user_id,
-            username=f"test_user_{user_id}",
-            event_type="login_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=i),
-            event_metadata={}
-        )
-        db.add(event)
-
+    rows.extend(
+        {
+            "id": generate_unique_id(f"failed-login-{user_id}"),
+            "user_id": user_id,
+            "username": f"test_user_{user_id}",
+            "event_type": "login_failure",
+            "ip_address": "10.0.0.50",
+            "user_agent": "Chrome/91.0",
+            "timestamp": base_time - _MIN[i],
+            "event_metadata": {}
+        }
+        for i in range(4)
+    )
     # Multiple failed 2FA with new IP/UA
-    for i in range(3):
-        event = MCPAuthEvent(
-            id=generate_unique_id(f"failed-2fa-{user_id}"),
-            user_id=user_id,
-            username=f"test_user_{user_id}",
-            event_type="2fa_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=i),
-            event_metadata={}
-        )
-        db.add(event)
-
-    db.commit()
+    rows.extend(
+        {
+            "id": generate_unique_id(f"failed-2fa-{user_id}"),
+            "user_id": user_id,
+            "username": f"test_user_{user_id}",
+            "event_type": "2fa_failure",
+            "ip_address": "10.0.0.50",
+            "user_agent": "Chrome/91.0",
+            "timestamp": base_time - _MIN[i + 1],
+            "event_metadata": {}
+        }
+        for i in range(3)
+    )
+    db.execute(insert(MCPAuthEvent), rows)
+    db.flush()
 
     # Analyze new event with the new IP/UA (different from previous successful login)
     new_event = AuthEventIn(
@@ -378,7 +365,7 @@ def test_alert_threshold():
         event_type="login_success",
         ip_address="10.0.0.50",  # Different from previous successful login
         user_agent="Chrome/91.0",  # Different from previous successful login
-        timestamp=base_time.isoformat() + "Z",
+        timestamp=BASE_TIME_ISO,
         metadata={}
     )
 
@@ -386,57 +373,42 @@ def test_alert_threshold():
 
     # Should have: 0.3 (failed logins) + 0.4 (failed 2FA) + 0.2 (IP change) + 0.1 (UA change) = 1.0 (capped)
     assert assessment.risk_score >= 0.7, f"Risk score should be >= 0.7, got {assessment.risk_score}"
-    assert assessment.alert is True, "Alert should be True for high risk score"
+    assert assessment.email_notification is True, "Email notification should be True for high risk score"
 
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Alert = {assessment.alert}")
+    logger.debug(f"Verified: Risk score = {assessment.risk_score:.2f}, Email notification = {assessment.email_notification}")
 
 
-def test_event_persistence_with_fraud_analysis():
+@pytest.mark.xdist_group(name="user-5007")
+def test_event_persistence_with_fraud_analysis(db):
     """Test that events are updated with fraud analysis results"""
-    print("\n✓ Test Event Persistence with Fraud Analysis")
-
-    user_id = 5007
-    base_time = datetime.utcnow()
-
-    # Create event via API
-    event_data = {
-        "user_id": user_id,
-        "username": f"test_user_{user_id}",
-        "event_type": "login_success",
-        "ip_address": "192.168.1.100",
-        "user_agent": "Mozilla/5.0",
-        "timestamp": base_time.isoformat() + "Z",
-        "metadata": {}
-    }
+    logger.debug("Test Event Persistence with Fraud Analysis")
 
-    response = client.post("/mcp/ingest", json=event_data)
+    # Create event via API using the pre-serialized payload
+    response = client.post("/mcp/ingest", content=INGEST_PAYLOAD, headers=_JSON_HEADERS)
     assert response.status_code == 201
 
     event_id = response.json()["event_id"]
 
     # Query database to verify fraud analysis was performed
-    db = SessionLocal()
-    stored_event = db.query(MCPAuthEvent).filter(MCPAuthEvent.id == event_id).first()
+    stored_event = _get_events_by_id(db, [event_id]).get(event_id)
 
     assert stored_event is not None
     assert stored_event.risk_score is not None, "Risk score should be set"
     assert stored_event.fraud_reason is not None, "Fraud reason should be set"
     assert stored_event.analyzed_at is not None, "Analyzed timestamp should be set"
 
-    db.close()
-    print(f"  Verified: Event stored with risk_score={stored_event.risk_score:.2f}, reason='{stored_event.fraud_reason}'")
+    logger.debug(f"Verified: Event stored with risk_score={stored_event.risk_score:.2f}, reason='{stored_event.fraud_reason}'")
 
 
-def test_normal_authentication_pattern():
+@pytest.mark.xdist_group(name="user-5008")
+def test_normal_authentication_pattern(db):
     """Test that normal authentication has low risk score"""
-    print("\n✓ Test Normal Authentication Pattern")
+    logger.debug("Test Normal Authentication Pattern")
 
-    db = SessionLocal()
-    detector = FraudDetector(fraud_threshold=0.7)
+    detector = DETECTOR
 
     user_id = 5008
-    base_time = datetime.utcnow()
+    base_time = BASE_TIME
 
     # Create normal previous login
     prev_event = MCPAuthEvent(
@@ -446,11 +418,11 @@ def test_normal_authentication_pattern():
         event_type="login_success",
         ip_address="192.168.1.100",
         user_agent="Mozilla/5.0",
-        timestamp=base_time - timedelta(hours=1),
+        timestamp=base_time - _HOUR[1],
         event_metadata={}
     )
     db.add(prev_event)
-    db.commit()
+    db.flush()
 
     # Analyze normal new event (same IP, same UA, no failures)
     new_event = AuthEventIn(
@@ -459,18 +431,72 @@ def test_normal_authentication_pattern():
         event_type="login_success",
         ip_address="192.168.1.100",
         user_agent="Mozilla/5.0",
-        timestamp=base_time.isoformat() + "Z",
+        timestamp=BASE_TIME_ISO,
         metadata={}
     )
 
     assessment = detector.analyze_event(new_event, db)
 
     assert assessment.risk_score == 0.0, f"Risk score should be 0.0 for normal pattern, got {assessment.risk_score}"
-    assert assessment.alert is False, "Alert should be False for normal pattern"
+    assert assessment.email_notification is False, "Email notification should be False for normal pattern"
     assert "normal" in assessment.reason.lower()
 
-    db.close()
-    print(f"  Verified: Risk score = {assessment.risk_score:.2f}, Alert = {assessment.alert}")
+    logger.debug(f"Verified: Risk score = {assessment.risk_score:.2f}, Email notification = {assessment.email_notification}")
+
+
+@pytest.mark.xdist_group(name="user-5009")
+def test_no_history_short_circuit(db):
+    """Test that a user with no prior events is assessed with one EXISTS probe"""
+    logger.debug("Test No-History Short Circuit")
+
+    user_id = 5009
+
+    new_event = AuthEventIn(
+        user_id=user_id,
+        username=f"test_user_{user_id}",
+        event_type="login_success",
+        ip_address="192.168.1.100",
+        user_agent="Mozilla/5.0",
+        timestamp=BASE_TIME_ISO,
+        metadata={}
+    )
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", _record)
+    try:
+        assessment = DETECTOR.analyze_event(new_event, db)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _record)
+
+    assert assessment.risk_score == 0.0
+    assert "normal" in assessment.reason.lower()
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1, f"Expected a single EXISTS probe, saw: {selects}"
+
+    logger.debug(f"Verified: one query issued for no-history user ({len(selects)} SELECT)")
+
+
+def test_fraud_query_uses_composite_index(db):
+    """Test that the fraud detector's count query resolves via the composite index"""
+    logger.debug("Test Composite Index Usage")
+
+    plan = db.execute(text(
+        "EXPLAIN QUERY PLAN "
+        "SELECT count(*) FROM mcp_auth_events "
+        "WHERE user_id = 1 AND event_type = 'login_failure' "
+        "AND timestamp >= '2024-01-01' AND timestamp < '2024-01-02'"
+    )).fetchall()
+
+    detail = " ".join(str(row[-1]) for row in plan)
+    assert "ix_user_type_timestamp" in detail, f"Query plan did not use the composite index: {detail}"
+
+    logger.debug(f"Verified: plan uses ix_user_type_timestamp ({detail})")
 
 
 if __name__ == "__main__":
@@ -478,41 +504,4 @@ if __name__ == "__main__":
     print("Task 5: Fraud Detection Engine Verification")
     print("=" * 60)
 
-    try:
-        test_fraud_assessment_model()
-        test_fraud_detector_initialization()
-        test_rule_multiple_failed_logins()
-        test_rule_multiple_failed_2fa()
-        test_rule_ip_address_change()
-        test_rule_user_agent_change()
-        test_combined_rules()
-        test_alert_threshold()
-        test_event_persistence_with_fraud_analysis()
-        test_normal_authentication_pattern()
-
-        print("\n" + "=" * 60)
-        print("✓ ALL FRAUD DETECTION TESTS PASSED")
-        print("=" * 60)
-        print("\nTask 5 Implementation Summary:")
-        print("  ✓ Created fraud_detector.py with FraudDetector class")
-        print("  ✓ Created FraudAssessment model with risk_score, alert, reason")
-        print("  ✓ Implemented _rule_based_analysis with all scoring rules:")
-        print("    - Multiple failed login attempts (3+ in 5 min): +0.3")
-        print("    - Multiple failed 2FA attempts (3+ in 5 min): +0.4")
-        print("    - IP address change: +0.2")
-        print("    - User agent change: +0.1")
-        print("  ✓ Implemented helper methods for querying recent events")
-        print("  ✓ Integrated fraud detection into event ingestion")
-        print("  ✓ MCPAuthEvent updated with risk_score and fraud_reason")
-        print("  ✓ Requirements 3.1, 3.2, 3.3, 3.4, 3.5 satisfied")
-
-    except AssertionError as e:
-        print(f"\n✗ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-    except Exception as e:
-        print(f"\n✗ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
@@ -1,12 +1,106 @@
 """
 Pytest configuration for MCP Server tests.
 
-Ensures the parent directory is in the Python path so imports work correctly.
+Ensures the parent directory is in the Python path so imports work correctly,
+and provides the session-scoped MCP server container shared by the
+integration test modules.
 """
 import sys
+import time
 from pathlib import Path
 
+import httpx
+import pytest
+
 # Add parent directory to Python path
 parent_dir = Path(__file__).parent.parent
 if str(parent_dir) not in sys.path:
     sys.path.insert(0, str(parent_dir))
+
+# testcontainers is only needed by the container-backed tests; modules
+# that never request mcp_container must stay runnable without it
+try:
+    from testcontainers.core.container import DockerContainer
+    from testcontainers.core.waiting_strategies import wait_for_logs
+    HAS_TESTCONTAINERS = True
+except ImportError:
+    DockerContainer = object
+    HAS_TESTCONTAINERS = False
+
+
+class MCPServerContainer(DockerContainer):
+    """
+    Custom testcontainer for MCP Server.
+    """
+
+    def __init__(self, image="auth_platform-mcp-server:latest", **kwargs):
+        super().__init__(image, **kwargs)
+        self.with_exposed_ports(8001)
+        self.with_env("LOG_LEVEL", "DEBUG")
+        self.with_env("FRAUD_THRESHOLD", "0.7")
+        self.with_env("DATABASE_URL", "sqlite:///./test_mcp.db")
+        # Registers the /mcp/test/* endpoints used for data isolation
+        self.with_env("TESTING_MODE", "true")
+
+    def get_api_url(self):
+        """Get the base URL for the MCP API"""
+        host = self.get_container_host_ip()
+        port = self.get_exposed_port(8001)
+        return f"http://{host}:{port}"
+
+
+@pytest.fixture(scope="session")
+def mcp_container():
+    """
+    One MCP server container for the whole test session.
+
+    Starting Docker is the dominant fixed cost of the integration
+    modules, so the container is shared across modules; per-test data
+    isolation comes from the autouse reset fixture below rather than
+    container recreation.
+    """
+    if not HAS_TESTCONTAINERS:
+        pytest.skip("testcontainers not installed")
+
+    container = MCPServerContainer()
+    container.start()
+
+    try:
+        # Gate on the server's own startup log instead of a fixed sleep,
+        # then confirm with a tight /health probe: readiness is observed
+        # within ~100 ms of the server accepting connections
+        wait_for_logs(container, r"Uvicorn running", timeout=30)
+
+        api_url = container.get_api_url()
+        for _ in range(30):
+            try:
+                if httpx.get(f"{api_url}/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        else:
+            pytest.fail("MCP server container never became healthy")
+
+        yield container
+
+    finally:
+        # Stop and remove container
+        container.stop()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_container_data(request):
+    """Truncate the container's auth-event table before each test that
+    uses the shared container, so session scope does not leak data
+    between tests"""
+    if "mcp_container" in request.fixturenames:
+        from utilities import tail_logs
+
+        container = request.getfixturevalue("mcp_container")
+        response = httpx.post(f"{container.get_api_url()}/mcp/test/reset", timeout=5.0)
+        assert response.status_code == 200, f"Container reset failed: {response.text}"
+        # Consume log output from earlier tests so each test's tail_logs
+        # reads start at its own activity
+        tail_logs(container)
+    yield
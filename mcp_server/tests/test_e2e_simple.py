@@ -8,45 +8,65 @@ Usage:
     pytest tests/test_e2e_simple.py -v -s --log-cli-level=INFO
 """
 import pytest
+import pytest_asyncio
 import httpx
 import asyncio
 import time
 import logging
-from datetime import datetime
+
+from utilities import AUTH_SERVICE_URL, MCP_SERVER_URL, wait_for, events_for_user
 
 logger = logging.getLogger(__name__)
 
-# Service URLs (can be overridden with environment variables)
-AUTH_SERVICE_URL = "http://localhost:8000"
-MCP_SERVER_URL = "http://localhost:8001"
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client():
+    """One AsyncClient for the whole session; keeps the connection pool warm
+    across tests instead of rebuilding it per test.
+
+    base_url covers the auth service; MCP requests pass absolute URLs,
+    which httpx routes over the same pool.
+    """
+    async with httpx.AsyncClient(
+        base_url=AUTH_SERVICE_URL,
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    ) as client:
+        yield client
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def check_services():
     """Verify services are running before tests"""
     logger.info("Checking if services are running...")
 
-    # Check Auth Service (check docs endpoint since /health doesn't exist)
-    try:
-        response = httpx.get(f"{AUTH_SERVICE_URL}/docs", timeout=5.0)
-        assert response.status_code == 200
-        logger.info("✓ Auth Service is running")
-    except Exception as e:
-        pytest.skip(f"Auth Service not available: {e}. Start with: docker-compose up -d")
-
-    # Check MCP Server
-    try:
-        response = httpx.get(f"{MCP_SERVER_URL}/health", timeout=5.0)
-        assert response.status_code == 200
-        logger.info("✓ MCP Server is running")
-    except Exception as e:
-        pytest.skip(f"MCP Server not available: {e}. Start with: docker-compose up -d")
+    # One client for both probes; module-level httpx.get() builds and
+    # tears down a throwaway client per call
+    with httpx.Client(timeout=5.0) as client:
+        # Check Auth Service (check docs endpoint since /health doesn't exist)
+        try:
+            response = client.get(f"{AUTH_SERVICE_URL}/docs")
+            assert response.status_code == 200
+            logger.info("✓ Auth Service is running")
+        except Exception as e:
+            pytest.skip(f"Auth Service not available: {e}. Start with: docker-compose up -d")
+
+        # Check MCP Server
+        try:
+            response = client.get(f"{MCP_SERVER_URL}/health")
+            assert response.status_code == 200
+            logger.info("✓ MCP Server is running")
+        except Exception as e:
+            pytest.skip(f"MCP Server not available: {e}. Start with: docker-compose up -d")
 
     yield
 
 
-@pytest.mark.asyncio
-async def test_complete_flow_signup_to_email_notification(check_services):
+# scope="session" shares one event loop with the session-scoped client
+# instead of tearing the loop down per test
+@pytest.mark.asyncio(scope="session")
+async def test_complete_flow_signup_to_email_notification(http_client, check_services):
     """
     Complete E2E test: Signup → Failed Logins → Fraud Detection → Email Notification
 
@@ -62,209 +82,216 @@ async def test_complete_flow_signup_to_email_notification(check_services):
     username = f"e2e_user_{timestamp}"
     password = "TestPassword123!"  # pragma: allowlist secret
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-
-        # ============================================================
-        # STEP 1: User Signup
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 1: User Signup")
-        logger.info(f"{'='*70}")
-        logger.info(f"Creating user: {username}")
-
-        signup_response = await client.post(
-            f"{AUTH_SERVICE_URL}/register",
-            json={"email": f"{username}@test.com", "username": username, "password": password, "first_name": "Test", "last_name": "User", "tier": "dev"}
-        )
-
-        assert signup_response.status_code == 200, \
-            f"Signup failed: {signup_response.status_code} - {signup_response.text}"
-
-        signup_data = signup_response.json()
-        access_token = signup_data["access_token"]
-
-        logger.info(f"✓ User created: username={username}")
-
-        # Wait for event to propagate
-        await asyncio.sleep(2)
-
-        # ============================================================
-        # STEP 2: Successful Login (Baseline)
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 2: Successful Login (Establish Baseline)")
-        logger.info(f"{'='*70}")
-
-        login_response = await client.post(
-            f"{AUTH_SERVICE_URL}/login",
-            json={"username": username, "password": password}
-        )
-
-        assert login_response.status_code == 200, \
-            f"Login failed: {login_response.status_code} - {login_response.text}"
-
-        login_data = login_response.json()
-        # Login may require 2FA, which is fine for our test
-        if "requires2fa" in login_data and login_data["requires2fa"]:
-            logger.info(f"✓ Login initiated (2FA required, which is expected)")
-        else:
-            assert "access_token" in login_data
-            logger.info(f"✓ Successful login completed")
-
-        await asyncio.sleep(2)
-
-        # ============================================================
-        # STEP 3: Multiple Failed Login Attempts
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 3: Simulating Brute Force Attack")
-        logger.info(f"{'='*70}")
-
-        failed_attempts = 12
-        logger.info(f"Performing {failed_attempts} failed login attempts...")
-
-        for i in range(failed_attempts):
-            failed_response = await client.post(
-                f"{AUTH_SERVICE_URL}/login",
-                json={"username": username, "password": "WrongPassword!"}  # pragma: allowlist secret
-            )
-
+    # ============================================================
+    # STEP 1: User Signup
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 1: User Signup")
+    logger.info(f"{'='*70}")
+    logger.info(f"Creating user: {username}")
+
+    signup_response = await http_client.post(
+        "/register",
+        json={"email": f"{username}@test.com", "username": username, "password": password, "first_name": "Test", "last_name": "User", "tier": "dev"}
+    )
+
+    assert signup_response.status_code == 200, \
+        f"Signup failed: {signup_response.status_code} - {signup_response.text}"
+
+    signup_data = signup_response.json()
+    access_token = signup_data["access_token"]
+
+    logger.info(f"✓ User created: username={username}")
+
+    # No propagation wait needed: registration does not emit an MCP
+    # event, and the next step polls for its own event anyway
+
+    # ============================================================
+    # STEP 2: Successful Login (Baseline)
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 2: Successful Login (Establish Baseline)")
+    logger.info(f"{'='*70}")
+
+    login_response = await http_client.post(
+        "/login",
+        json={"username": username, "password": password}
+    )
+
+    assert login_response.status_code == 200, \
+        f"Login failed: {login_response.status_code} - {login_response.text}"
+
+    login_data = login_response.json()
+    # Login may require 2FA, which is fine for our test
+    if "requires2fa" in login_data and login_data["requires2fa"]:
+        logger.info(f"✓ Login initiated (2FA required, which is expected)")
+    else:
+        assert "access_token" in login_data
+        logger.info(f"✓ Successful login completed")
+
+    # Poll until the baseline login event lands instead of sleeping
+    # out a fixed 2 seconds
+    async def _baseline_ingested():
+        return len(await events_for_user(http_client, username)) >= 1
+
+    await wait_for(_baseline_ingested)
+
+    # ============================================================
+    # STEP 3: Multiple Failed Login Attempts
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 3: Simulating Brute Force Attack")
+    logger.info(f"{'='*70}")
+
+    failed_attempts = 12
+    logger.info(f"Performing {failed_attempts} failed login attempts...")
+
+    # Issue the attempts concurrently: each one is independent, so the
+    # burst takes roughly one round trip instead of 12 serial ones. The
+    # semaphore bounds in-flight requests; no client-side pacing is
+    # needed to stay within the 5-minute window since the server
+    # timestamps each event on ingest.
+    sem = asyncio.Semaphore(8)
+
+    # The body never changes between attempts, so build it once
+    bad_credentials = {"username": username, "password": "WrongPassword!"}  # pragma: allowlist secret
+
+    async def one_attempt():
+        async with sem:
+            failed_response = await http_client.post("/login", json=bad_credentials)
             assert failed_response.status_code == 401, \
                 f"Expected 401 for wrong password, got {failed_response.status_code}"
 
-            if (i + 1) % 3 == 0:
-                logger.info(f"  Progress: {i+1}/{failed_attempts} failed attempts")
+    await asyncio.gather(*(one_attempt() for _ in range(failed_attempts)))
+
+    logger.info(f"✓ Completed {failed_attempts} failed login attempts")
+
+    # Poll until every failed attempt has been ingested and analyzed
+    # rather than sleeping out a fixed 5-second worst case. The last
+    # successful poll keeps its parsed events for the checks below.
+    logger.info("Waiting for fraud analysis to complete...")
+    user_events = []
+
+    async def _all_failures_ingested():
+        user_events[:] = await events_for_user(http_client, username)
+        failures = sum(1 for e in user_events if e["event_type"] == "login_failure")
+        return failures >= failed_attempts
+
+    await wait_for(_all_failures_ingested, timeout=15.0)
+
+    user_id = user_events[0]["user_id"]
+    logger.info(f"Retrieved user_id from MCP Server: {user_id}")
+
+    # ============================================================
+    # STEP 4: Verify Fraud Detection
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 4: Verify Fraud Detection")
+    logger.info(f"{'='*70}")
+
+    fraud_response = await http_client.get(
+        f"{MCP_SERVER_URL}/mcp/fraud-assessments",
+        params={"user_id": user_id, "sort_by": "risk_score", "sort_order": "desc"}
+    )
+
+    assert fraud_response.status_code == 200, \
+        f"Failed to query fraud assessments: {fraud_response.text}"
+
+    fraud_data = fraud_response.json()
+    assessments = fraud_data["assessments"]
+
+    assert len(assessments) > 0, "No fraud assessments found"
+
+    # Get highest risk assessment
+    highest_risk = assessments[0]  # Already sorted by risk_score desc
+
+    logger.info(f"Fraud Assessment Results:")
+    logger.info(f"  Risk Score: {highest_risk['risk_score']:.2f}")
+    logger.info(f"  Reason: {highest_risk['reason']}")
+    logger.info(f"  Email Notification: {highest_risk['email_notification']}")
+
+    # Verify high risk score
+    assert highest_risk['risk_score'] >= 0.7, \
+        f"Expected risk_score >= 0.7 for brute force attack, got {highest_risk['risk_score']}"
+
+    # Verify reason mentions failed logins
+    assert "failed login" in highest_risk['reason'].lower(), \
+        f"Expected fraud reason to mention failed logins"
+
+    logger.info(f"✓ Fraud detection verified: HIGH RISK")
+
+    # ============================================================
+    # STEP 5: Verify Email Notification Would Be Sent
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 5: Verify Email Notification Logic")
+    logger.info(f"{'='*70}")
+
+    # Count high-risk events (risk_score >= 0.7)
+    high_risk_events = [a for a in assessments if a['risk_score'] >= 0.7]
+
+    logger.info(f"High-risk events found: {len(high_risk_events)}")
+
+    for i, event in enumerate(high_risk_events[:3], 1):  # Show first 3
+        logger.info(f"  {i}. Risk: {event['risk_score']:.2f} - {event['reason']}")
+
+    assert len(high_risk_events) > 0, \
+        "Expected at least one high-risk event that would trigger email notification"
+
+    logger.info(f"✓ Email notification would be triggered for {len(high_risk_events)} event(s)")
+
+    # ============================================================
+    # STEP 6: Verify Event Storage
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"STEP 6: Verify Event Storage")
+    logger.info(f"{'='*70}")
 
-            # Small delay to stay within 5-minute window
-            await asyncio.sleep(0.3)
+    events_response = await http_client.get(
+        f"{MCP_SERVER_URL}/mcp/events",
+        params={"user_id": user_id, "limit": 100}
+    )
 
-        logger.info(f"✓ Completed {failed_attempts} failed login attempts")
+    assert events_response.status_code == 200
+    events_data = events_response.json()
+    events = events_data["events"]
 
-        # Wait for MCP Server to process all events
-        logger.info("Waiting for fraud analysis to complete...")
-        await asyncio.sleep(5)
+    # Count event types
+    event_counts = {}
+    for event in events:
+        event_type = event["event_type"]
+        event_counts[event_type] = event_counts.get(event_type, 0) + 1
 
-        # Get user_id from MCP Server by querying events with username
-        events_by_username_response = await client.get(
-            f"{MCP_SERVER_URL}/mcp/events",
-            params={"username": username, "limit": 1}
-        )
-        assert events_by_username_response.status_code == 200
-        events_by_username = events_by_username_response.json()["events"]
-        assert len(events_by_username) > 0, f"No events found for username {username}"
-        user_id = events_by_username[0]["user_id"]
-        logger.info(f"Retrieved user_id from MCP Server: {user_id}")
-
-        # ============================================================
-        # STEP 4: Verify Fraud Detection
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 4: Verify Fraud Detection")
-        logger.info(f"{'='*70}")
-
-        fraud_response = await client.get(
-            f"{MCP_SERVER_URL}/mcp/fraud-assessments",
-            params={"user_id": user_id, "sort_by": "risk_score", "sort_order": "desc"}
-        )
-
-        assert fraud_response.status_code == 200, \
-            f"Failed to query fraud assessments: {fraud_response.text}"
-
-        fraud_data = fraud_response.json()
-        assessments = fraud_data["assessments"]
-
-        assert len(assessments) > 0, "No fraud assessments found"
-
-        # Get highest risk assessment
-        highest_risk = assessments[0]  # Already sorted by risk_score desc
-
-        logger.info(f"Fraud Assessment Results:")
-        logger.info(f"  Risk Score: {highest_risk['risk_score']:.2f}")
-        logger.info(f"  Reason: {highest_risk['reason']}")
-        logger.info(f"  Email Notification: {highest_risk['email_notification']}")
-
-        # Verify high risk score
-        assert highest_risk['risk_score'] >= 0.7, \
-            f"Expected risk_score >= 0.7 for brute force attack, got {highest_risk['risk_score']}"
-
-        # Verify reason mentions failed logins
-        assert "failed login" in highest_risk['reason'].lower(), \
-            f"Expected fraud reason to mention failed logins"
-
-        logger.info(f"✓ Fraud detection verified: HIGH RISK")
-
-        # ============================================================
-        # STEP 5: Verify Email Notification Would Be Sent
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 5: Verify Email Notification Logic")
-        logger.info(f"{'='*70}")
-
-        # Count high-risk events (risk_score >= 0.7)
-        high_risk_events = [a for a in assessments if a['risk_score'] >= 0.7]
-
-        logger.info(f"High-risk events found: {len(high_risk_events)}")
-
-        for i, event in enumerate(high_risk_events[:3], 1):  # Show first 3
-            logger.info(f"  {i}. Risk: {event['risk_score']:.2f} - {event['reason']}")
-
-        assert len(high_risk_events) > 0, \
-            "Expected at least one high-risk event that would trigger email notification"
-
-        logger.info(f"✓ Email notification would be triggered for {len(high_risk_events)} event(s)")
-
-        # ============================================================
-        # STEP 6: Verify Event Storage
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"STEP 6: Verify Event Storage")
-        logger.info(f"{'='*70}")
-
-        events_response = await client.get(
-            f"{MCP_SERVER_URL}/mcp/events",
-            params={"user_id": user_id, "limit": 100}
-        )
-
-        assert events_response.status_code == 200
-        events_data = events_response.json()
-        events = events_data["events"]
-
-        # Count event types
-        event_counts = {}
-        for event in events:
-            event_type = event["event_type"]
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
-
-        logger.info(f"Event Summary:")
-        for event_type, count in sorted(event_counts.items()):
-            logger.info(f"  {event_type}: {count}")
-
-        # Verify expected events
-        # Note: Auth service may not send signup events, only login events
-        assert event_counts.get("login_failure", 0) >= failed_attempts, \
-            f"Expected {failed_attempts} login_failure events, got {event_counts.get('login_failure', 0)}"
-
-        logger.info(f"✓ All events properly stored")
-
-        # ============================================================
-        # TEST SUMMARY
-        # ============================================================
-        logger.info(f"\n{'='*70}")
-        logger.info(f"TEST SUMMARY")
-        logger.info(f"{'='*70}")
-        logger.info(f"✅ User signup: {username} (user_id={user_id})")
-        logger.info(f"✅ Baseline login: Successful")
-        logger.info(f"✅ Attack simulation: {failed_attempts} failed attempts")
-        logger.info(f"✅ Fraud detection: risk_score={highest_risk['risk_score']:.2f}")
-        logger.info(f"✅ Email notification: Would be sent ({len(high_risk_events)} events)")
-        logger.info(f"✅ Event storage: {len(events)} total events")
-        logger.info(f"{'='*70}")
-        logger.info(f"🎉 END-TO-END TEST PASSED")
-        logger.info(f"{'='*70}\n")
-
-
-@pytest.mark.asyncio
-async def test_low_risk_no_email_notification(check_services):
+    logger.info(f"Event Summary:")
+    for event_type, count in sorted(event_counts.items()):
+        logger.info(f"  {event_type}: {count}")
+
+    # Verify expected events
+    # Note: Auth service may not send signup events, only login events
+    assert event_counts.get("login_failure", 0) >= failed_attempts, \
+        f"Expected {failed_attempts} login_failure events, got {event_counts.get('login_failure', 0)}"
+
+    logger.info(f"✓ All events properly stored")
+
+    # ============================================================
+    # TEST SUMMARY
+    # ============================================================
+    logger.info(f"\n{'='*70}")
+    logger.info(f"TEST SUMMARY")
+    logger.info(f"{'='*70}")
+    logger.info(f"✅ User signup: {username} (user_id={user_id})")
+    logger.info(f"✅ Baseline login: Successful")
+    logger.info(f"✅ Attack simulation: {failed_attempts} failed attempts")
+    logger.info(f"✅ Fraud detection: risk_score={highest_risk['risk_score']:.2f}")
+    logger.info(f"✅ Email notification: Would be sent ({len(high_risk_events)} events)")
+    logger.info(f"✅ Event storage: {len(events)} total events")
+    logger.info(f"{'='*70}")
+    logger.info(f"🎉 END-TO-END TEST PASSED")
+    logger.info(f"{'='*70}\n")
+
+
+@pytest.mark.asyncio(scope="session")
+async def test_low_risk_no_email_notification(http_client, check_services):
     """
     Test that low-risk activity does NOT trigger email notification
     """
@@ -272,57 +299,53 @@ async def test_low_risk_no_email_notification(check_services):
     username = f"normal_user_{timestamp}"
     password = "TestPassword123!"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-
-        logger.info(f"\n{'='*70}")
-        logger.info(f"TEST: Low-Risk Activity (No Email Notification)")
-        logger.info(f"{'='*70}")
-
-        # Signup
-        signup_response = await client.post(
-            f"{AUTH_SERVICE_URL}/register",
-            json={"email": f"{username}@test.com", "username": username, "password": password, "first_name": "Test", "last_name": "User", "tier": "dev"}
-        )
-        assert signup_response.status_code == 200
-
-        await asyncio.sleep(2)
-
-        # Single successful login
-        login_response = await client.post(
-            f"{AUTH_SERVICE_URL}/login",
-            json={"username": username, "password": password}
-        )
-        assert login_response.status_code == 200
-
-        await asyncio.sleep(3)
-
-        # Get user_id from events
-        events_response = await client.get(
-            f"{MCP_SERVER_URL}/mcp/events",
-            params={"username": username, "limit": 1}
-        )
-        assert events_response.status_code == 200
-        events = events_response.json()["events"]
-        assert len(events) > 0
-        user_id = events[0]["user_id"]
-
-        # Check fraud assessments
-        fraud_response = await client.get(
-            f"{MCP_SERVER_URL}/mcp/fraud-assessments",
-            params={"user_id": user_id}
-        )
-        assert fraud_response.status_code == 200
-
-        assessments = fraud_response.json()["assessments"]
-
-        # All assessments should be low risk
-        for assessment in assessments:
-            logger.info(f"Risk Score: {assessment['risk_score']:.2f} - {assessment['reason']}")
-            assert assessment['risk_score'] < 0.7, \
-                f"Expected low risk for normal activity, got {assessment['risk_score']}"
-
-        logger.info(f"✓ No email notification triggered (all risk scores < 0.7)")
-        logger.info(f"✅ TEST PASSED: Low-risk activity correctly identified\n")
+    logger.info(f"\n{'='*70}")
+    logger.info(f"TEST: Low-Risk Activity (No Email Notification)")
+    logger.info(f"{'='*70}")
+
+    # Signup
+    signup_response = await http_client.post(
+        "/register",
+        json={"email": f"{username}@test.com", "username": username, "password": password, "first_name": "Test", "last_name": "User", "tier": "dev"}
+    )
+    assert signup_response.status_code == 200
+
+    # Single successful login
+    login_response = await http_client.post(
+        "/login",
+        json={"username": username, "password": password}
+    )
+    assert login_response.status_code == 200
+
+    # Poll until the login event lands instead of sleeping 3 s,
+    # reusing the parsed events from the last successful poll
+    events = []
+
+    async def _login_ingested():
+        events[:] = await events_for_user(http_client, username)
+        return len(events) > 0
+
+    await wait_for(_login_ingested)
+
+    user_id = events[0]["user_id"]
+
+    # Check fraud assessments
+    fraud_response = await http_client.get(
+        f"{MCP_SERVER_URL}/mcp/fraud-assessments",
+        params={"user_id": user_id}
+    )
+    assert fraud_response.status_code == 200
+
+    assessments = fraud_response.json()["assessments"]
+
+    # All assessments should be low risk
+    for assessment in assessments:
+        logger.info(f"Risk Score: {assessment['risk_score']:.2f} - {assessment['reason']}")
+        assert assessment['risk_score'] < 0.7, \
+            f"Expected low risk for normal activity, got {assessment['risk_score']}"
+
+    logger.info(f"✓ No email notification triggered (all risk scores < 0.7)")
+    logger.info(f"✅ TEST PASSED: Low-risk activity correctly identified\n")
 
 
 if __name__ == "__main__":
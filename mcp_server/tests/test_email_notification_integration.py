@@ -11,68 +11,56 @@ Requirements: testcontainers-python
 Install with: pip install testcontainers[docker]
 """
 import pytest
-import time
-import requests
+import pytest_asyncio
+import httpx
+import re
 from datetime import datetime, timedelta
-from testcontainers.core.container import DockerContainer
-from testcontainers.core.waiting_strategies import wait_for_logs
-
-
-class MCPServerContainer(DockerContainer):
-    """
-    Custom testcontainer for MCP Server.
-    """
-
-    def __init__(self, image="auth_platform-mcp-server:latest", **kwargs):
-        super().__init__(image, **kwargs)
-        self.with_exposed_ports(8001)
-        self.with_env("LOG_LEVEL", "DEBUG")
-        self.with_env("FRAUD_THRESHOLD", "0.7")
-        self.with_env("DATABASE_URL", "sqlite:///./test_mcp.db")
-
-    def get_api_url(self):
-        """Get the base URL for the MCP API"""
-        host = self.get_container_host_ip()
-        port = self.get_exposed_port(8001)
-        return f"http://{host}:{port}"
-
-
-@pytest.fixture(scope="module")
-def mcp_container():
-    """
-    Fixture that starts MCP server container for the test module.
-    """
-    container = MCPServerContainer()
-
-    # Start container and wait for it to be ready
-    container.start()
-
-    # Wait for the server to be ready (look for startup log)
-    try:
-        # Give the server time to start
-        time.sleep(3)
-
-        # Verify server is responding
-        api_url = container.get_api_url()
-        max_retries = 10
-        for i in range(max_retries):
-            try:
-                response = requests.get(f"{api_url}/health", timeout=2)
-                if response.status_code == 200:
-                    break
-            except requests.exceptions.RequestException:
-                if i == max_retries - 1:
-                    raise
-                time.sleep(1)
-
-        yield container
-
-    finally:
-        # Stop and remove container
-        container.stop()
-
-
-def test_email_notification_logging_for_brute_force_attack(mcp_container):
+# Skip (rather than abort collection of) this module when testcontainers
+# is missing, so `pytest tests/` stays runnable without it
+wait_for_logs = pytest.importorskip(
+    "testcontainers.core.waiting_strategies",
+    reason="testcontainers is required for the container-backed tests",
+).wait_for_logs
+
+from utilities import wait_for, tail_logs, iso_second_offsets
+
+# The mcp_container fixture lives in conftest.py at session scope so the
+# container (and its Docker start/stop cost) is shared across modules
+
+# Every log marker the assertions below look for, collected in a single
+# pass over the captured tail instead of one substring scan per assert.
+# Longer alternatives come before their prefixes so findall returns the
+# most specific marker at each position.
+LOG_MARKERS_RE = re.compile(
+    r"📧 EMAIL NOTIFICATION TRIGGER"
+    r"|⚠️ HIGH RISK EVENT DETECTED"
+    r"|Severe brute force attack detected"
+    r"|failed logins in 5 minutes"
+    r"|failed login"
+    r"|IP address changed"
+    r"|risk_score=0\.7"
+    r"|Risk: 0\.7"
+    r"|2FA|2fa"
+)
+
+
+def log_markers(logs):
+    """Set of known markers present in a log blob (one regex pass)"""
+    return set(LOG_MARKERS_RE.findall(logs))
+
+
+@pytest_asyncio.fixture(scope="module")
+async def api_client(mcp_container):
+    """One pooled AsyncClient bound to the container API for the whole module;
+    ingest bursts reuse its keep-alive connections instead of opening a new
+    TCP connection per request"""
+    async with httpx.AsyncClient(base_url=mcp_container.get_api_url(), timeout=10.0) as client:
+        yield client
+
+
+@pytest.mark.xdist_group("mcp_container")
+@pytest.mark.asyncio(scope="module")
+async def test_email_notification_logging_for_brute_force_attack(mcp_container, api_client):
     """
     Test that email notification logs appear when a brute force attack is detected.
 
@@ -83,56 +71,54 @@ def test_email_notification_logging_for_brute_force_attack(mcp_container):
 
     Requirements: 3.1, 3.4, 4.1
     """
-    api_url = mcp_container.get_api_url()
     user_id = 1001
     username = "brute_force_victim"
     base_time = datetime.utcnow()
 
-    # Send 12 failed login attempts within a 5-minute window
+    # Send 12 failed login attempts within a 5-minute window as one
+    # batch: a single request and commit replaces 12 HTTP round-trips.
     # This should trigger: 11+ failed logins = +0.7 risk score
-    event_ids = []
-
-    for i in range(12):
-        event_data = {
-            "user_id": user_id,
-            "username": username,
-            "event_type": "login_failure",
-            "timestamp": (base_time + timedelta(seconds=i)).isoformat() + "Z",
-            "ip_address": "10.0.0.100",
-            "user_agent": "AttackBot/1.0",
-            "metadata": {"attempt": i + 1}
-        }
-
-        response = requests.post(f"{api_url}/mcp/ingest", json=event_data)
-        assert response.status_code == 201, f"Failed to ingest event {i}: {response.text}"
-
-        event_id = response.json()["event_id"]
-        event_ids.append(event_id)
-
-        # Small delay to ensure events are processed in order
-        time.sleep(0.2)
-
-    # Give the server time to process all events and write logs
-    time.sleep(2)
-
-    # Get container logs
-    logs = mcp_container.get_logs()[0].decode('utf-8')
+    base_event = {
+        "user_id": user_id,
+        "username": username,
+        "event_type": "login_failure",
+        "ip_address": "10.0.0.100",
+        "user_agent": "AttackBot/1.0",
+    }
+    response = await api_client.post("/mcp/ingest/bulk", json={"events": [
+        {**base_event, "timestamp": ts, "metadata": {"attempt": i + 1}}
+        for i, ts in enumerate(iso_second_offsets(base_time, 12))
+    ]})
+    assert response.status_code == 201, f"Bulk ingest failed: {response.text}"
+
+    # Analysis and the notification log lines are written before each
+    # response returns; wait_for_logs only covers log-stream flushing.
+    # Require the trigger and username on one line so leftovers from
+    # earlier tests (trigger from one, username from another) never
+    # satisfy the wait spuriously
+    trigger_line = f"📧 EMAIL NOTIFICATION TRIGGER: Would send email to user {username} "
+    wait_for_logs(mcp_container, lambda logs: trigger_line in logs, timeout=10)
+
+    # Read only this test's slice of the container logs and collect the
+    # markers it contains in one pass
+    logs = tail_logs(mcp_container)
+    markers = log_markers(logs)
 
     # Verify email notification logs are present
-    assert "📧 EMAIL NOTIFICATION TRIGGER" in logs, \
+    assert "📧 EMAIL NOTIFICATION TRIGGER" in markers, \
         "Email notification log not found in container logs"
 
-    assert "⚠️ HIGH RISK EVENT DETECTED" in logs, \
+    assert "⚠️ HIGH RISK EVENT DETECTED" in markers, \
         "High risk event log not found in container logs"
 
     assert username in logs, \
         f"Username '{username}' not found in logs"
 
-    assert "Severe brute force attack detected" in logs or "failed logins in 5 minutes" in logs, \
+    assert markers & {"Severe brute force attack detected", "failed logins in 5 minutes"}, \
         "Brute force detection reason not found in logs"
 
     # Verify the risk score in logs
-    assert "risk_score=0.7" in logs or "Risk: 0.7" in logs, \
+    assert markers & {"risk_score=0.7", "Risk: 0.7"}, \
         "Expected risk score (0.7) not found in logs"
 
     print("\n✅ Email notification logging test passed!")
@@ -140,7 +126,9 @@ def test_email_notification_logging_for_brute_force_attack(mcp_container):
     print(f"✅ Email notification logs found in container output")
 
 
-def test_email_notification_logging_for_ip_change_with_failures(mcp_container):
+@pytest.mark.xdist_group("mcp_container")
+@pytest.mark.asyncio(scope="module")
+async def test_email_notification_logging_for_ip_change_with_failures(mcp_container, api_client):
     """
     Test email notification logging for IP change combined with failed attempts.
 
@@ -151,7 +139,6 @@ def test_email_notification_logging_for_ip_change_with_failures(mcp_container):
 
     Requirements: 3.1, 3.4
     """
-    api_url = mcp_container.get_api_url()
     user_id = 1002
     username = "ip_change_victim"
     base_time = datetime.utcnow()
@@ -167,49 +154,52 @@ def test_email_notification_logging_for_ip_change_with_failures(mcp_container):
         "metadata": {}
     }
 
-    response = requests.post(f"{api_url}/mcp/ingest", json=success_event)
-    assert response.status_code == 201
-    time.sleep(0.5)
-
-    # Now send 6 failed login attempts from a different IP
-    # This should trigger: 6-10 failed logins = +0.5, IP change = +0.2 = 0.7 total
-    for i in range(6):
-        event_data = {
-            "user_id": user_id,
-            "username": username,
-            "event_type": "login_failure",
-            "timestamp": (base_time + timedelta(seconds=i)).isoformat() + "Z",
-            "ip_address": "10.0.0.200",  # Different IP
-            "user_agent": "Chrome/91.0",
-            "metadata": {"attempt": i + 1}
-        }
-
-        response = requests.post(f"{api_url}/mcp/ingest", json=event_data)
-        assert response.status_code == 201
-        time.sleep(0.2)
-
-    # Give time for processing
-    time.sleep(2)
-
-    # Get container logs
-    logs = mcp_container.get_logs()[0].decode('utf-8')
+    # One batch: the success is listed (and inserted) first so the
+    # IP-change check has the original IP on record when the failures
+    # from a different IP are analyzed. The window counts strictly
+    # earlier events, so 7 failures are needed for the last one to see
+    # 6 prior: 6-10 failed logins = +0.5, IP change = +0.2 = 0.7 total
+    base_event = {
+        "user_id": user_id,
+        "username": username,
+        "event_type": "login_failure",
+        "ip_address": "10.0.0.200",  # Different IP
+        "user_agent": "Chrome/91.0",
+    }
+    response = await api_client.post("/mcp/ingest/bulk", json={"events": [success_event] + [
+        {**base_event, "timestamp": ts, "metadata": {"attempt": i + 1}}
+        for i, ts in enumerate(iso_second_offsets(base_time, 7))
+    ]})
+    assert response.status_code == 201, f"Bulk ingest failed: {response.text}"
+
+    # Trigger and username must appear on one line; see the note in the
+    # brute-force test
+    trigger_line = f"📧 EMAIL NOTIFICATION TRIGGER: Would send email to user {username} "
+    wait_for_logs(mcp_container, lambda logs: trigger_line in logs, timeout=10)
+
+    # Read only this test's slice of the container logs and collect the
+    # markers it contains in one pass
+    logs = tail_logs(mcp_container)
+    markers = log_markers(logs)
 
     # Verify email notification logs
-    assert "📧 EMAIL NOTIFICATION TRIGGER" in logs, \
+    assert "📧 EMAIL NOTIFICATION TRIGGER" in markers, \
         "Email notification log not found"
 
     assert username in logs, \
         f"Username '{username}' not found in logs"
 
     # Should mention both IP change and failed attempts
-    assert "IP address changed" in logs or "failed login" in logs, \
+    assert markers & {"IP address changed", "failed logins in 5 minutes", "failed login"}, \
         "Expected fraud detection reasons not found in logs"
 
     print("\n✅ IP change with failures test passed!")
     print(f"✅ Successfully detected suspicious activity for user '{username}'")
 
 
-def test_no_email_notification_for_low_risk_events(mcp_container):
+@pytest.mark.xdist_group("mcp_container")
+@pytest.mark.asyncio(scope="module")
+async def test_no_email_notification_for_low_risk_events(mcp_container, api_client):
     """
     Test that email notification logs do NOT appear for low-risk events.
 
@@ -219,48 +209,60 @@ def test_no_email_notification_for_low_risk_events(mcp_container):
 
     Requirements: 3.1, 4.1
     """
-    api_url = mcp_container.get_api_url()
     user_id = 1003
     username = "normal_user"
     base_time = datetime.utcnow()
 
-    # Send a few normal login events
-    for i in range(3):
-        event_data = {
-            "user_id": user_id,
-            "username": username,
-            "event_type": "login_success",
-            "timestamp": (base_time + timedelta(minutes=i)).isoformat() + "Z",
-            "ip_address": "192.168.1.100",
-            "user_agent": "Chrome/91.0",
-            "metadata": {}
-        }
-
-        response = requests.post(f"{api_url}/mcp/ingest", json=event_data)
-        assert response.status_code == 201
-        time.sleep(0.2)
-
-    # Give time for processing
-    time.sleep(2)
-
-    # Get recent logs (last 50 lines to avoid checking old test logs)
-    logs = mcp_container.get_logs()[0].decode('utf-8')
-    recent_logs = '\n'.join(logs.split('\n')[-50:])
-
-    # Verify NO email notification logs for this user
-    user_specific_logs = [line for line in recent_logs.split('\n') if username in line]
-
-    for log_line in user_specific_logs:
-        assert "📧 EMAIL NOTIFICATION TRIGGER" not in log_line, \
-            f"Unexpected email notification log found for low-risk user: {log_line}"
-        assert "⚠️ HIGH RISK EVENT DETECTED" not in log_line, \
-            f"Unexpected high risk log found for low-risk user: {log_line}"
+    # Send a few normal login events in one batch
+    base_event = {
+        "user_id": user_id,
+        "username": username,
+        "event_type": "login_success",
+        "ip_address": "192.168.1.100",
+        "user_agent": "Chrome/91.0",
+        "metadata": {}
+    }
+    response = await api_client.post("/mcp/ingest/bulk", json={"events": [
+        {**base_event, "timestamp": (base_time + timedelta(minutes=i)).isoformat() + "Z"}
+        for i in range(3)
+    ]})
+    assert response.status_code == 201, f"Bulk ingest failed: {response.text}"
+
+    # There is no trigger log to wait for here, so poll the events API
+    # until all three events are queryable, then assert on a snapshot of
+    # the logs
+    async def _all_ingested():
+        events_response = await api_client.get(
+            "/mcp/events", params={"user_id": user_id, "limit": 10}
+        )
+        assert events_response.status_code == 200
+        return len(events_response.json()["events"]) >= 3
+
+    await wait_for(_all_ingested)
+
+    # The tail contains only this test's output, so no line-count
+    # heuristics are needed to skip older tests' logs
+    recent_logs = tail_logs(mcp_container)
+
+    # Verify NO email notification logs for this user: pull the lines
+    # mentioning the user in one multiline-regex pass, then scan just
+    # those for the forbidden markers
+    user_line_re = re.compile(rf"^.*{re.escape(username)}.*$", re.M)
+    user_specific_logs = "\n".join(user_line_re.findall(recent_logs))
+    user_markers = log_markers(user_specific_logs)
+
+    assert "📧 EMAIL NOTIFICATION TRIGGER" not in user_markers, \
+        f"Unexpected email notification log found for low-risk user '{username}'"
+    assert "⚠️ HIGH RISK EVENT DETECTED" not in user_markers, \
+        f"Unexpected high risk log found for low-risk user '{username}'"
 
     print("\n✅ Low-risk event test passed!")
     print(f"✅ No email notifications triggered for normal user '{username}'")
 
 
-def test_email_notification_logging_for_2fa_failures(mcp_container):
+@pytest.mark.xdist_group("mcp_container")
+@pytest.mark.asyncio(scope="module")
+async def test_email_notification_logging_for_2fa_failures(mcp_container, api_client):
     """
     Test email notification logging for multiple 2FA failures.
 
@@ -270,49 +272,53 @@ def test_email_notification_logging_for_2fa_failures(mcp_container):
 
     Requirements: 3.1, 3.4
     """
-    api_url = mcp_container.get_api_url()
     user_id = 1004
     username = "2fa_attack_victim"
     base_time = datetime.utcnow()
 
-    # Send 11 failed 2FA attempts
+    # Send 12 failed 2FA attempts in one batch; the window counts
+    # strictly earlier events, so the last one sees 11 prior
     # This should trigger: 11+ failed 2FA = +0.8 risk score
-    for i in range(11):
-        event_data = {
-            "user_id": user_id,
-            "username": username,
-            "event_type": "2fa_failure",
-            "timestamp": (base_time + timedelta(seconds=i)).isoformat() + "Z",
-            "ip_address": "10.0.0.150",
-            "user_agent": "2FABot/1.0",
-            "metadata": {"attempt": i + 1}
-        }
-
-        response = requests.post(f"{api_url}/mcp/ingest", json=event_data)
-        assert response.status_code == 201
-        time.sleep(0.2)
-
-    # Give time for processing
-    time.sleep(2)
-
-    # Get container logs
-    logs = mcp_container.get_logs()[0].decode('utf-8')
+    base_event = {
+        "user_id": user_id,
+        "username": username,
+        "event_type": "2fa_failure",
+        "ip_address": "10.0.0.150",
+        "user_agent": "2FABot/1.0",
+    }
+    response = await api_client.post("/mcp/ingest/bulk", json={"events": [
+        {**base_event, "timestamp": ts, "metadata": {"attempt": i + 1}}
+        for i, ts in enumerate(iso_second_offsets(base_time, 12))
+    ]})
+    assert response.status_code == 201, f"Bulk ingest failed: {response.text}"
+
+    # Trigger and username must appear on one line; see the note in the
+    # brute-force test
+    trigger_line = f"📧 EMAIL NOTIFICATION TRIGGER: Would send email to user {username} "
+    wait_for_logs(mcp_container, lambda logs: trigger_line in logs, timeout=10)
+
+    # Read only this test's slice of the container logs and collect the
+    # markers it contains in one pass
+    logs = tail_logs(mcp_container)
+    markers = log_markers(logs)
 
     # Verify email notification logs
-    assert "📧 EMAIL NOTIFICATION TRIGGER" in logs, \
+    assert "📧 EMAIL NOTIFICATION TRIGGER" in markers, \
         "Email notification log not found for 2FA attack"
 
     assert username in logs, \
         f"Username '{username}' not found in logs"
 
-    assert "2FA" in logs or "2fa" in logs, \
+    assert markers & {"2FA", "2fa"}, \
         "2FA-related fraud detection not found in logs"
 
     print("\n✅ 2FA failure test passed!")
     print(f"✅ Successfully detected 2FA brute force attack for user '{username}'")
 
 
-def test_verify_fraud_assessment_api_after_email_trigger(mcp_container):
+@pytest.mark.xdist_group("mcp_container")
+@pytest.mark.asyncio(scope="module")
+async def test_verify_fraud_assessment_api_after_email_trigger(mcp_container, api_client):
     """
     Test that fraud assessments API returns correct data after email notification trigger.
 
@@ -323,32 +329,28 @@ def test_verify_fraud_assessment_api_after_email_trigger(mcp_container):
 
     Requirements: 3.4, 7.1, 7.2
     """
-    api_url = mcp_container.get_api_url()
     user_id = 1005
     username = "api_test_user"
     base_time = datetime.utcnow()
 
-    # Send events to trigger high risk
-    for i in range(12):
-        event_data = {
-            "user_id": user_id,
-            "username": username,
-            "event_type": "login_failure",
-            "timestamp": (base_time + timedelta(seconds=i)).isoformat() + "Z",
-            "ip_address": "10.0.0.250",
-            "user_agent": "TestBot/1.0",
-            "metadata": {}
-        }
-
-        response = requests.post(f"{api_url}/mcp/ingest", json=event_data)
-        assert response.status_code == 201
-        time.sleep(0.2)
-
-    # Give time for processing
-    time.sleep(2)
-
-    # Query fraud assessments API
-    response = requests.get(f"{api_url}/mcp/fraud-assessments?user_id={user_id}")
+    # Send events to trigger high risk, as one batch
+    base_event = {
+        "user_id": user_id,
+        "username": username,
+        "event_type": "login_failure",
+        "ip_address": "10.0.0.250",
+        "user_agent": "TestBot/1.0",
+        "metadata": {}
+    }
+    response = await api_client.post("/mcp/ingest/bulk", json={"events": [
+        {**base_event, "timestamp": ts}
+        for ts in iso_second_offsets(base_time, 12)
+    ]})
+    assert response.status_code == 201, f"Bulk ingest failed: {response.text}"
+
+    # Analysis commits before each ingest response returns, so the
+    # assessments are already queryable; no settle time needed
+    response = await api_client.get("/mcp/fraud-assessments", params={"user_id": user_id})
     assert response.status_code == 200
 
     data = response.json()
@@ -7,214 +7,228 @@ alert threshold logic, and BAML fallback behavior.
 Requirements: 3.1, 3.2, 3.3, 3.5, 5.5
 """
 import pytest
+import sys
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from unittest.mock import Mock, patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
 from db import Base
 from models import MCPAuthEvent
 from fraud_detector import FraudDetector, FraudAssessment
 from schemas import AuthEventIn
-from baml_client import BAMLClient, BAMLFraudAssessment, LoginEvent
+from baml_client import BAMLFraudAssessment
 
-# Create test database
-TEST_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Literals shared by the hundreds of seeded rows in this module; interned
+# so every row references the same string object instead of a fresh copy
+EVT_LOGIN_FAILURE = sys.intern("login_failure")
+EVT_2FA_FAILURE = sys.intern("2fa_failure")
+EVT_LOGIN_SUCCESS = sys.intern("login_success")
+IP_LAN = sys.intern("192.168.1.100")
+UA_MOZ = sys.intern("Mozilla/5.0")
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+
+@pytest.fixture(scope="session")
+def engine():
+    """One in-memory engine and schema for the whole test session.
+
+    StaticPool serves every checkout from the same SQLite connection, so
+    the schema and the compiled-statement cache are built once rather
+    than per test.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINTs; take
+    # over BEGIN emission so the per-test savepoint rollback works
+    # (standard SQLAlchemy recipe for SQLite + nested transactions)
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_isolation(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_sqlite(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture
-def db_session():
-    """Create a fresh database session for each test"""
-    db = TestingSessionLocal()
+def db_session(engine):
+    """Create a fresh database session for each test.
+
+    The session runs inside an outer transaction on a dedicated
+    connection; test-level commit() releases a SAVEPOINT, and teardown
+    rolls the outer transaction back, which is cheaper than DELETE plus
+    COMMIT per test and leaves the shared schema untouched.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
     try:
-        # Clean database
-        db.query(MCPAuthEvent).delete()
-        db.commit()
         yield db
     finally:
         db.close()
+        transaction.rollback()
+        connection.close()
 
 
-@pytest.fixture
-def fraud_detector():
-    """Create a fraud detector instance with default settings"""
+@pytest.fixture(scope="session")
+def _fraud_detector_instance():
+    """One fraud detector instance constructed for the whole session"""
     return FraudDetector(fraud_threshold=0.7, baml_enabled=False)
 
 
 @pytest.fixture
-def base_event():
-    """Create a base authentication event for testing"""
-    return AuthEventIn(
-        user_id=1000,
-        username="test_user",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        timestamp=datetime.utcnow().isoformat() + "Z",
-        metadata={}
-    )
-
-
-# ============================================================================
-# Rule 1: Multiple Failed Login Attempts Tests
-# ============================================================================
+def fraud_detector(_fraud_detector_instance):
+    """Session detector with its caches cleared per test.
 
-def test_rule_multiple_failed_logins_triggers(db_session, fraud_detector, base_event):
-    """
-    Test that 3+ failed login attempts in 5 minutes adds 0.3 to risk score.
-    Requirements: 3.2
+    Tests seed events straight into the database, bypassing the
+    invalidation and write-through that ingesting them through the
+    detector would do, so stale cached state could otherwise leak
+    between tests.
     """
-    base_time = datetime.utcnow()
-
-    # Create 3 failed login attempts in the last 5 minutes
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
-    db_session.commit()
-
-    # Analyze new event
-    base_event.timestamp = base_time.isoformat() + "Z"
-    assessment = fraud_detector.analyze_event(base_event, db_session)
+    _fraud_detector_instance._assessment_cache.clear()
+    _fraud_detector_instance._last_login_cache.clear()
+    return _fraud_detector_instance
 
-    assert assessment.risk_score >= 0.3
-    assert "Multiple failed login attempts" in assessment.reason
-    assert "(3 in 5 minutes)" in assessment.reason
 
+@pytest.fixture(scope="module")
+def base_event_factory():
+    """Factory producing copies of a shared base authentication event.
 
-def test_rule_multiple_failed_logins_no_trigger(db_session, fraud_detector, base_event):
-    """
-    Test that fewer than 3 failed login attempts does not trigger the rule.
-    Requirements: 3.2
+    The template is validated once; each call hands out a model_copy so
+    tests can tweak fields without mutating shared state or re-running
+    full Pydantic validation.
     """
-    base_time = datetime.utcnow()
-
-    # Create only 2 failed login attempts
-    for i in range(2):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=3-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
-    db_session.commit()
-
-    # Analyze new event
-    base_event.timestamp = base_time.isoformat() + "Z"
-    assessment = fraud_detector.analyze_event(base_event, db_session)
+    template = AuthEventIn(
+        user_id=1000,
+        username="test_user",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+        timestamp=datetime.utcnow().isoformat() + "Z",
+        metadata={}
+    )
 
-    assert "Multiple failed login attempts" not in assessment.reason
+    def _make(**overrides):
+        return template.model_copy(update=overrides)
 
+    return _make
 
-def test_rule_multiple_failed_logins_outside_window(db_session, fraud_detector, base_event):
-    """
-    Test that failed logins outside the 5-minute window don't trigger the rule.
-    Requirements: 3.2
-    """
-    base_time = datetime.utcnow()
 
-    # Create 3 failed login attempts but outside the 5-minute window
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=10+i),
+@pytest.fixture
+def base_event(base_event_factory):
+    """Per-test copy of the shared base event"""
+    return base_event_factory()
+
+
+def seed_events(
+    db_session,
+    id_prefix,
+    user_id,
+    username,
+    event_type,
+    ip_address,
+    user_agent,
+    timestamps
+):
+    """Stage a batch of historical events with one multi-row INSERT.
+
+    bulk_save_objects skips the per-object unit-of-work instrumentation
+    that a loop of db_session.add() calls would pay, which dominates
+    fixture setup time across these tests. Callers commit.
+    """
+    db_session.bulk_save_objects([
+        MCPAuthEvent(
+            id=f"{id_prefix}{i}",
+            user_id=user_id,
+            username=username,
+            event_type=event_type,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            timestamp=timestamp,
             event_metadata={}
         )
-        db_session.add(failed_event)
-    db_session.commit()
-
-    # Analyze new event
-    base_event.timestamp = base_time.isoformat() + "Z"
-    assessment = fraud_detector.analyze_event(base_event, db_session)
-
-    assert "Multiple failed login attempts" not in assessment.reason
+        for i, timestamp in enumerate(timestamps)
+    ])
 
 
 # ============================================================================
-# Rule 2: Multiple Failed 2FA Attempts Tests
+# Rules 1 & 2: Failed Login / Failed 2FA Count Tests
 # ============================================================================
 
-def test_rule_multiple_failed_2fa_triggers(db_session, fraud_detector, base_event):
-    """
-    Test that 3+ failed 2FA attempts in 5 minutes adds 0.4 to risk score.
-    Requirements: 3.2
-    """
+@pytest.fixture
+def seeded_failures(request, db_session, base_event):
+    """Seed failure events per the (event_type, minute_offsets) request
+    param and return the base time the analyzed event should use"""
+    event_type, minute_offsets = request.param
     base_time = datetime.utcnow()
 
-    # Create 3 failed 2FA attempts in the last 5 minutes
-    for i in range(3):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
+    seed_events(
+        db_session,
+        id_prefix=f"{event_type}-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=event_type,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=m) for m in minute_offsets],
+    )
     db_session.commit()
 
-    # Analyze new event
-    base_event.timestamp = base_time.isoformat() + "Z"
-    assessment = fraud_detector.analyze_event(base_event, db_session)
-
-    assert assessment.risk_score >= 0.4
-    assert "Multiple failed 2FA attempts" in assessment.reason
-    assert "(3 in 5 minutes)" in assessment.reason
-
-
-def test_rule_multiple_failed_2fa_no_trigger(db_session, fraud_detector, base_event):
-    """
-    Test that fewer than 3 failed 2FA attempts does not trigger the rule.
+    return base_time
+
+
+@pytest.mark.parametrize(
+    "seeded_failures,min_score,reason_fragment,expect_trigger",
+    [
+        # 3+ failed logins in 5 minutes adds 0.3
+        ((EVT_LOGIN_FAILURE, [4, 3, 2]), 0.3, "Multiple failed login attempts", True),
+        # Fewer than 3 failed logins does not trigger the rule
+        ((EVT_LOGIN_FAILURE, [3, 2]), None, "Multiple failed login attempts", False),
+        # Failed logins outside the 5-minute window do not trigger it
+        ((EVT_LOGIN_FAILURE, [10, 11, 12]), None, "Multiple failed login attempts", False),
+        # 3+ failed 2FA attempts in 5 minutes adds 0.4
+        ((EVT_2FA_FAILURE, [4, 3, 2]), 0.4, "Multiple failed 2FA attempts", True),
+        # Fewer than 3 failed 2FA attempts does not trigger the rule
+        ((EVT_2FA_FAILURE, [3, 2]), None, "Multiple failed 2FA attempts", False),
+    ],
+    indirect=["seeded_failures"],
+    ids=[
+        "failed-logins-trigger",
+        "failed-logins-below-threshold",
+        "failed-logins-outside-window",
+        "failed-2fa-trigger",
+        "failed-2fa-below-threshold",
+    ],
+)
+def test_rule_failed_attempt_counts(
+    seeded_failures, db_session, fraud_detector, base_event,
+    min_score, reason_fragment, expect_trigger
+):
+    """
+    Test the failed-login and failed-2FA counting rules across trigger,
+    below-threshold, and outside-window cases with shared seeding.
     Requirements: 3.2
     """
-    base_time = datetime.utcnow()
-
-    # Create only 2 failed 2FA attempts
-    for i in range(2):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=3-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
-    db_session.commit()
+    base_time = seeded_failures
 
     # Analyze new event
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
-    assert "Multiple failed 2FA attempts" not in assessment.reason
+    if expect_trigger:
+        assert assessment.risk_score >= min_score
+        assert reason_fragment in assessment.reason
+        assert "(3 in 5 minutes)" in assessment.reason
+    else:
+        assert reason_fragment not in assessment.reason
 
 
 # ============================================================================
@@ -233,9 +247,9 @@ def test_rule_ip_change_triggers(db_session, fraud_detector, base_event):
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
     )
@@ -244,7 +258,7 @@ def test_rule_ip_change_triggers(db_session, fraud_detector, base_event):
 
     # Analyze new event with different IP
     base_event.ip_address = "10.0.0.50"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score >= 0.2
@@ -263,9 +277,9 @@ def test_rule_ip_change_no_trigger_same_ip(db_session, fraud_detector, base_even
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
     )
@@ -274,7 +288,7 @@ def test_rule_ip_change_no_trigger_same_ip(db_session, fraud_detector, base_even
 
     # Analyze new event with same IP
     base_event.ip_address = "192.168.1.100"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert "IP address changed" not in assessment.reason
@@ -288,7 +302,7 @@ def test_rule_ip_change_no_trigger_no_previous_login(db_session, fraud_detector,
     base_time = datetime.utcnow()
 
     # No previous login events
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert "IP address changed" not in assessment.reason
@@ -310,8 +324,8 @@ def test_rule_user_agent_change_triggers(db_session, fraud_detector, base_event)
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
@@ -321,7 +335,7 @@ def test_rule_user_agent_change_triggers(db_session, fraud_detector, base_event)
 
     # Analyze new event with different user agent
     base_event.user_agent = "Chrome/91.0.4472.124"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score >= 0.1
@@ -340,8 +354,8 @@ def test_rule_user_agent_change_no_trigger_same_ua(db_session, fraud_detector, b
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
@@ -351,7 +365,7 @@ def test_rule_user_agent_change_no_trigger_same_ua(db_session, fraud_detector, b
 
     # Analyze new event with same user agent
     base_event.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert "User agent changed" not in assessment.reason
@@ -373,8 +387,8 @@ def test_risk_score_multiple_rules_combined(db_session, fraud_detector, base_eve
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
@@ -382,39 +396,35 @@ def test_risk_score_multiple_rules_combined(db_session, fraud_detector, base_eve
     db_session.add(prev_login)
 
     # Create 3 failed login attempts
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address="10.0.0.50",
+        user_agent="Chrome/91.0",
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     # Create 3 failed 2FA attempts
-    for i in range(3):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
+    seed_events(
+        db_session,
+        id_prefix="2fa-failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_2FA_FAILURE,
+        ip_address="10.0.0.50",
+        user_agent="Chrome/91.0",
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
     # Analyze new event with different IP and user agent
     base_event.ip_address = "10.0.0.50"
     base_event.user_agent = "Chrome/91.0"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     # Expected: 0.3 (failed logins) + 0.4 (failed 2FA) + 0.2 (IP change) + 0.1 (UA change) = 1.0
@@ -439,45 +449,41 @@ def test_risk_score_capped_at_one(db_session, fraud_detector, base_event):
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
     )
     db_session.add(prev_login)
 
-    for i in range(5):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
-
-    for i in range(5):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="10.0.0.50",
-            user_agent="Chrome/91.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address="10.0.0.50",
+        user_agent="Chrome/91.0",
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(5)],
+    )
+
+    seed_events(
+        db_session,
+        id_prefix="2fa-failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_2FA_FAILURE,
+        ip_address="10.0.0.50",
+        user_agent="Chrome/91.0",
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(5)],
+    )
 
     db_session.commit()
 
     base_event.ip_address = "10.0.0.50"
     base_event.user_agent = "Chrome/91.0"
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score <= 1.0
@@ -495,8 +501,8 @@ def test_risk_score_zero_for_normal_activity(db_session, fraud_detector, base_ev
         id="prev-login",
         user_id=base_event.user_id,
         username=base_event.username,
-        event_type="login_success",
-        ip_address="192.168.1.100",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
@@ -505,7 +511,7 @@ def test_risk_score_zero_for_normal_activity(db_session, fraud_detector, base_ev
     db_session.commit()
 
     # Analyze new event with same IP and user agent, no failed attempts
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score == 0.0
@@ -524,36 +530,32 @@ def test_alert_threshold_triggers_above_threshold(db_session, fraud_detector, ba
     base_time = datetime.utcnow()
 
     # Create conditions for high risk score (> 0.7)
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
-
-    for i in range(3):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
+
+    seed_events(
+        db_session,
+        id_prefix="2fa-failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_2FA_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
     # Risk score should be 0.3 + 0.4 = 0.7
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score >= 0.7
@@ -568,23 +570,21 @@ def test_alert_threshold_no_trigger_below_threshold(db_session, fraud_detector,
     base_time = datetime.utcnow()
 
     # Create conditions for low risk score (< 0.7)
-    for i in range(2):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(2)],
+    )
 
     db_session.commit()
 
     # Risk score should be 0.0 (only 2 failed attempts, need 3)
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = fraud_detector.analyze_event(base_event, db_session)
 
     assert assessment.risk_score < 0.7
@@ -601,22 +601,20 @@ def test_alert_threshold_custom_threshold(db_session, base_event):
     base_time = datetime.utcnow()
 
     # Create conditions for risk score of 0.4
-    for i in range(3):
-        failed_2fa = MCPAuthEvent(
-            id=f"2fa-failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="2fa_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_2fa)
+    seed_events(
+        db_session,
+        id_prefix="2fa-failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_2FA_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = custom_detector.analyze_event(base_event, db_session)
 
     # Risk score is 0.4, which is below default 0.7 but below custom 0.5
@@ -628,6 +626,31 @@ def test_alert_threshold_custom_threshold(db_session, base_event):
 # BAML Fallback Behavior Tests
 # ============================================================================
 
+class FakeBAMLClient:
+    """Minimal stand-in for BAMLClient; avoids Mock's per-test spec
+    introspection and records the call the detector makes."""
+
+    def __init__(self):
+        self.available = True
+        self.result = None
+        self.calls = 0
+
+    def is_available(self):
+        return self.available
+
+    def analyze_fraud_sync(self, *args, **kwargs):
+        self.calls += 1
+        return self.result
+
+
+@pytest.fixture
+def fake_baml(monkeypatch):
+    """Route the detector's BAML lookup to one reconfigurable fake"""
+    client = FakeBAMLClient()
+    monkeypatch.setattr("fraud_detector.get_baml_client", lambda **kwargs: client)
+    return client
+
+
 def test_baml_fallback_when_disabled(db_session, base_event):
     """
     Test that rule-based detection is used when BAML is disabled.
@@ -637,22 +660,20 @@ def test_baml_fallback_when_disabled(db_session, base_event):
     base_time = datetime.utcnow()
 
     # Create conditions for rule-based detection
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = detector.analyze_event(base_event, db_session)
 
     # Should use rule-based detection
@@ -661,37 +682,31 @@ def test_baml_fallback_when_disabled(db_session, base_event):
     assert "[BAML]" not in assessment.reason
 
 
-@patch('mcp_server.fraud_detector.get_baml_client')
-def test_baml_fallback_when_unavailable(mock_get_baml_client, db_session, base_event):
+def test_baml_fallback_when_unavailable(fake_baml, db_session, base_event):
     """
     Test that rule-based detection is used when BAML client is unavailable.
     Requirements: 5.5
     """
-    # Mock BAML client as unavailable
-    mock_client = Mock(spec=BAMLClient)
-    mock_client.is_available.return_value = False
-    mock_get_baml_client.return_value = mock_client
+    fake_baml.available = False
 
     detector = FraudDetector(fraud_threshold=0.7, baml_enabled=True)
     base_time = datetime.utcnow()
 
     # Create conditions for rule-based detection
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = detector.analyze_event(base_event, db_session)
 
     # Should fall back to rule-based detection
@@ -700,29 +715,36 @@ def test_baml_fallback_when_unavailable(mock_get_baml_client, db_session, base_e
     assert "[BAML]" not in assessment.reason
 
 
-@patch('mcp_server.fraud_detector.get_baml_client')
-def test_baml_analysis_success(mock_get_baml_client, db_session, base_event):
+def test_baml_analysis_success(fake_baml, db_session, base_event):
     """
     Test that BAML analysis is used when available and returns results.
     Requirements: 5.5
     """
-    # Mock BAML client with successful response
-    mock_client = Mock(spec=BAMLClient)
-    mock_client.is_available.return_value = True
-
-    baml_result = BAMLFraudAssessment(
+    fake_baml.result = BAMLFraudAssessment(
         risk_score=0.85,
         alert=True,
         reason="AI detected suspicious pattern",
         confidence=0.95
     )
-    mock_client.analyze_fraud_sync.return_value = baml_result
-    mock_get_baml_client.return_value = mock_client
 
     detector = FraudDetector(fraud_threshold=0.7, baml_enabled=True)
     base_time = datetime.utcnow()
 
-    base_event.timestamp = base_time.isoformat() + "Z"
+    # Seed a mid-range rule score (3 failed logins = 0.3) so the
+    # uncertain-band gate actually invokes BAML
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
+    db_session.commit()
+
+    base_event.timestamp = base_time
     assessment = detector.analyze_event(base_event, db_session)
 
     # Should use BAML result
@@ -731,40 +753,35 @@ def test_baml_analysis_success(mock_get_baml_client, db_session, base_event):
     assert assessment.confidence == 0.95
     assert "[BAML]" in assessment.reason
     assert "AI detected suspicious pattern" in assessment.reason
+    assert fake_baml.calls == 1
 
 
-@patch('mcp_server.fraud_detector.get_baml_client')
-def test_baml_fallback_on_error(mock_get_baml_client, db_session, base_event):
+def test_baml_fallback_on_error(fake_baml, db_session, base_event):
     """
     Test that rule-based detection is used when BAML analysis fails.
     Requirements: 5.5
     """
-    # Mock BAML client that returns None (error case)
-    mock_client = Mock(spec=BAMLClient)
-    mock_client.is_available.return_value = True
-    mock_client.analyze_fraud_sync.return_value = None
-    mock_get_baml_client.return_value = mock_client
+    # BAML client available but returning None (error case)
+    fake_baml.result = None
 
     detector = FraudDetector(fraud_threshold=0.7, baml_enabled=True)
     base_time = datetime.utcnow()
 
     # Create conditions for rule-based detection
-    for i in range(3):
-        failed_event = MCPAuthEvent(
-            id=f"failed-{i}",
-            user_id=base_event.user_id,
-            username=base_event.username,
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=4-i),
-            event_metadata={}
-        )
-        db_session.add(failed_event)
+    seed_events(
+        db_session,
+        id_prefix="failed-",
+        user_id=base_event.user_id,
+        username=base_event.username,
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+    )
 
     db_session.commit()
 
-    base_event.timestamp = base_time.isoformat() + "Z"
+    base_event.timestamp = base_time
     assessment = detector.analyze_event(base_event, db_session)
 
     # Should fall back to rule-based detection
@@ -782,78 +799,120 @@ def test_error_handling_returns_safe_default(db_session, base_event):
     Test that errors during analysis are handled gracefully.
     Requirements: 3.5
     """
-    # Create a detector and force an error by passing invalid database session
     detector = FraudDetector(fraud_threshold=0.7, baml_enabled=False)
 
-    # Pass None as database session to trigger error in helper methods
-    # The helper methods catch errors and return 0/False, so analysis continues
+    # A missing database session takes the explicit pre-check fast path:
+    # no helper runs and no exception is raised or swallowed
     assessment = detector.analyze_event(base_event, None)
 
-    # Should handle errors gracefully and return a result
-    # Since all helper methods return safe defaults (0, False), we get normal pattern
+    # Should return the safe default assessment
     assert assessment.risk_score == 0.0
     assert assessment.email_notification is False
     assert assessment.confidence == 1.0
     # The reason will be "Normal authentication pattern" since no rules triggered
 
 
+# ============================================================================
+# Batch Analysis Tests
+# ============================================================================
+
+@pytest.mark.parametrize("user_ids", [[3000, 3000], [3001, 3002]],
+                         ids=["one-user", "multiple-users"])
+def test_analyze_event_batch(db_session, fraud_detector, base_event_factory, user_ids):
+    """
+    Test that analyze_event_batch scores each event like per-event
+    analysis, collecting signals once per distinct user.
+    Requirements: 3.2
+    """
+    base_time = datetime.utcnow()
+
+    # Seed enough failures for each user to trigger the failed-login rule
+    for user_id in set(user_ids):
+        seed_events(
+            db_session,
+            id_prefix=f"batch-{user_id}-",
+            user_id=user_id,
+            username=f"batch_user_{user_id}",
+            event_type=EVT_LOGIN_FAILURE,
+            ip_address=IP_LAN,
+            user_agent=UA_MOZ,
+            timestamps=[base_time - timedelta(minutes=4-i) for i in range(3)],
+        )
+    db_session.commit()
+
+    events = [
+        base_event_factory(
+            user_id=user_id,
+            username=f"batch_user_{user_id}",
+            timestamp=base_time,
+        )
+        for user_id in user_ids
+    ]
+
+    assessments = fraud_detector.analyze_event_batch(events, db_session)
+
+    assert len(assessments) == len(events)
+    for assessment in assessments:
+        assert assessment.risk_score >= 0.3
+        assert "Multiple failed login attempts" in assessment.reason
+
+
+def test_analyze_event_batch_empty(db_session, fraud_detector):
+    """Test that an empty batch returns an empty list without touching the DB"""
+    assert fraud_detector.analyze_event_batch([], db_session) == []
+
+
 # ============================================================================
 # Helper Method Tests
 # ============================================================================
 
 def test_count_recent_events(db_session, fraud_detector):
     """
-    Test the _count_recent_events helper method.
+    Test the windowed failure counts collected by _collect_signals.
     Requirements: 3.2
     """
     base_time = datetime.utcnow()
     user_id = 2000
 
     # Create events within window
-    for i in range(3):
-        event = MCPAuthEvent(
-            id=f"event-{i}",
-            user_id=user_id,
-            username="test_user",
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=i),
-            event_metadata={}
-        )
-        db_session.add(event)
+    seed_events(
+        db_session,
+        id_prefix="event-",
+        user_id=user_id,
+        username="test_user",
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=i) for i in range(3)],
+    )
 
     # Create events outside window
-    for i in range(2):
-        event = MCPAuthEvent(
-            id=f"old-event-{i}",
-            user_id=user_id,
-            username="test_user",
-            event_type="login_failure",
-            ip_address="192.168.1.100",
-            user_agent="Mozilla/5.0",
-            timestamp=base_time - timedelta(minutes=10+i),
-            event_metadata={}
-        )
-        db_session.add(event)
+    seed_events(
+        db_session,
+        id_prefix="old-event-",
+        user_id=user_id,
+        username="test_user",
+        event_type=EVT_LOGIN_FAILURE,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
+        timestamps=[base_time - timedelta(minutes=10+i) for i in range(2)],
+    )
 
     db_session.commit()
 
-    # Count events in 5-minute window
-    count = fraud_detector._count_recent_events(
+    # Only the events in the 5-minute window should be counted
+    signals = fraud_detector._collect_signals(
         db=db_session,
         user_id=user_id,
-        event_type="login_failure",
-        since=base_time - timedelta(minutes=5),
         before=base_time + timedelta(seconds=1)
     )
 
-    assert count == 3
+    assert signals.failed_logins == 3
 
 
 def test_check_ip_change(db_session, fraud_detector):
     """
-    Test the _check_ip_change helper method.
+    Test the previous-login IP collected by _collect_signals.
     Requirements: 3.2
     """
     base_time = datetime.utcnow()
@@ -864,37 +923,28 @@ def test_check_ip_change(db_session, fraud_detector):
         id="prev-login",
         user_id=user_id,
         username="test_user",
-        event_type="login_success",
-        ip_address="192.168.1.100",
-        user_agent="Mozilla/5.0",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
+        user_agent=UA_MOZ,
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
     )
     db_session.add(prev_login)
     db_session.commit()
 
-    # Check with different IP
-    ip_changed = fraud_detector._check_ip_change(
-        db=db_session,
-        user_id=user_id,
-        current_ip="10.0.0.50",
-        before=base_time
-    )
-    assert ip_changed is True
-
-    # Check with same IP
-    ip_not_changed = fraud_detector._check_ip_change(
+    # The previous login's IP should be reported for comparison
+    signals = fraud_detector._collect_signals(
         db=db_session,
         user_id=user_id,
-        current_ip="192.168.1.100",
         before=base_time
     )
-    assert ip_not_changed is False
+    assert signals.prev_ip == "192.168.1.100"
+    assert signals.prev_ip != "10.0.0.50"
 
 
 def test_check_user_agent_change(db_session, fraud_detector):
     """
-    Test the _check_user_agent_change helper method.
+    Test the previous-login user agent collected by _collect_signals.
     Requirements: 3.2
     """
     base_time = datetime.utcnow()
@@ -905,8 +955,8 @@ def test_check_user_agent_change(db_session, fraud_detector):
         id="prev-login",
         user_id=user_id,
         username="test_user",
-        event_type="login_success",
-        ip_address="192.168.1.100",
+        event_type=EVT_LOGIN_SUCCESS,
+        ip_address=IP_LAN,
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         timestamp=base_time - timedelta(hours=1),
         event_metadata={}
@@ -914,23 +964,14 @@ def test_check_user_agent_change(db_session, fraud_detector):
     db_session.add(prev_login)
     db_session.commit()
 
-    # Check with different user agent
-    ua_changed = fraud_detector._check_user_agent_change(
-        db=db_session,
-        user_id=user_id,
-        current_ua="Chrome/91.0.4472.124",
-        before=base_time
-    )
-    assert ua_changed is True
-
-    # Check with same user agent
-    ua_not_changed = fraud_detector._check_user_agent_change(
+    # The previous login's user agent should be reported for comparison
+    signals = fraud_detector._collect_signals(
         db=db_session,
         user_id=user_id,
-        current_ua="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         before=base_time
     )
-    assert ua_not_changed is False
+    assert signals.prev_ua == "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    assert signals.prev_ua != "Chrome/91.0.4472.124"
 
 
 # ============================================================================
@@ -0,0 +1,72 @@
+"""
+Shared helpers for the E2E test modules
+"""
+import asyncio
+import time
+from datetime import timedelta
+
+# Service URLs (can be overridden with environment variables)
+AUTH_SERVICE_URL = "http://localhost:8000"
+MCP_SERVER_URL = "http://localhost:8001"
+
+
+async def wait_for(pred, timeout=10.0, interval=0.1):
+    """Poll an async predicate until it is truthy or the timeout lapses.
+
+    Replaces fixed asyncio.sleep() slack: on a fast runner the test
+    proceeds as soon as the condition holds instead of waiting out the
+    worst case, while the timeout still fails fast on a broken server.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await pred():
+            return
+        await asyncio.sleep(interval)
+    raise AssertionError("Timed out waiting for condition")
+
+
+def tail_logs(container):
+    """Return only the log output produced since the previous call.
+
+    The read offsets are remembered on the container itself, so tests
+    against a long-lived session-scoped container decode and scan just
+    their own slice of the log stream instead of the whole, ever-growing
+    blob on every assertion. stdout and stderr grow independently, so
+    each keeps its own offset; slicing their concatenation with a single
+    offset would re-read or skip bytes whenever the other stream grew.
+    """
+    stdout, stderr = container.get_logs()
+    out_offset, err_offset = getattr(container, "_log_offsets", (0, 0))
+    container._log_offsets = (len(stdout), len(stderr))
+    new = stdout[out_offset:] + stderr[err_offset:]
+    return new.decode("utf-8", errors="replace")
+
+
+def iso_second_offsets(base_time, count):
+    """ISO-8601 "Z" timestamps for base_time + 0..count-1 seconds.
+
+    Formats the invariant date/hour/minute prefix once per minute and
+    assembles the per-second suffix with integer arithmetic, instead of
+    constructing and formatting a fresh datetime for every offset.
+    """
+    base = base_time.replace(microsecond=0)
+    prefixes = {}
+    stamps = []
+    for i in range(count):
+        minutes, seconds = divmod(base.second + i, 60)
+        prefix = prefixes.get(minutes)
+        if prefix is None:
+            prefix = (base + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:")
+            prefixes[minutes] = prefix
+        stamps.append(f"{prefix}{seconds:02d}Z")
+    return stamps
+
+
+async def events_for_user(client, username, limit=100):
+    """Fetch recent MCP events and filter to the given username"""
+    response = await client.get(
+        f"{MCP_SERVER_URL}/mcp/events",
+        params={"limit": limit}
+    )
+    assert response.status_code == 200
+    return [e for e in response.json()["events"] if e["username"] == username]